@@ -0,0 +1,242 @@
+"""Headless micro-benchmarks of the ticker displays.
+
+    python benchmarks/bench_displays.py -o bench.json
+    python benchmarks/bench_displays.py -o bench.json --baseline baseline.json
+
+With --baseline, the results are compared with a saved result file and
+the exit status is 1 if any benchmark is slower than the tolerance allows.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CWD = os.getcwd()
+sys.path.insert(0, ROOT)
+# fonts are loaded by relative paths.
+os.chdir(ROOT)
+
+import numpy as np
+import panda3d
+from panda3d.core import NodePath, load_prc_file_data
+
+load_prc_file_data('', """
+    window-type none
+    audio-library-name null
+""")
+
+from tickers.base_ticker import Size
+from tickers.message_cache import message_cache
+from tickers.ticker_displays import SquareDisplay, CircularDisplay, VerticalDisplay
+from tickers.transitions import EFFECTS
+
+
+# A message wider than the texture is not drawn, so the medium and the long
+# messages are the starts of TEXT that fill about half and all of the texture.
+SHORT = 'Panda3D'
+TEXT = 'Welcome to the Panda3D ticker display benchmark, which measures ' \
+       'the rendering and the transitions of the messages on every display'
+
+DISPLAYS = [
+    ['square', SquareDisplay, {}, [Size(256 * 6, 256 * 2, 3), Size(256 * 12, 256 * 2, 3)]],
+    ['square_compact', SquareDisplay, dict(compact=True), [Size(256 * 12, 256 * 2, 3)]],
+    ['circular_outer', CircularDisplay, dict(outer=True), [Size(256 * 10, 256 * 2, 3), Size(256 * 20, 256 * 2, 3)]],
+    ['circular_inner', CircularDisplay, dict(outer=False), [Size(256 * 10, 256 * 2, 3), Size(256 * 20, 256 * 2, 3)]],
+    ['vertical', VerticalDisplay, {}, [Size(256 * 5, 256 * 2, 3), Size(256 * 10, 256 * 2, 3)]],
+    ['vertical_compact', VerticalDisplay, dict(compact=True), [Size(256 * 10, 256 * 2, 3)]],
+]
+
+
+def measure(func, repeat, setup=None):
+    """Return the list of seconds that func took in each repeat.
+    """
+    times = []
+
+    for _ in range(repeat):
+        if setup:
+            setup()
+
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def summarize(times, steps=1):
+    times = [t / steps for t in times]
+
+    return dict(
+        median_ms=statistics.median(times) * 1000,
+        min_ms=min(times) * 1000,
+        max_ms=max(times) * 1000
+    )
+
+
+def run_transition(display, msg_img):
+    """Delete the current message and display msg_img; returns the number of steps.
+    """
+    steps = 0
+    display.prepare_for_deletion()
+
+    while not display.delete_msg(steps):
+        steps += 1
+
+    display.prepare_for_display(msg_img)
+    step = 0
+
+    while not display.display_msg(step):
+        step += 1
+
+    return steps + step + 2
+
+
+def has_text(msg_img):
+    return msg_img.top >= msg_img.btm
+
+
+def make_messages(display):
+    """Return the short, medium and long messages that fit the texture of the display.
+    """
+    # the longest start of TEXT that is drawn, by bisection.
+    lo, hi = 0, len(TEXT)
+
+    while lo < hi:
+        n = (lo + hi + 1) // 2
+
+        if has_text(display.rasterize(TEXT[:n])):
+            lo = n
+        else:
+            hi = n - 1
+
+    return dict(short=SHORT, medium=TEXT[:lo // 2].rstrip(), long=TEXT[:lo].rstrip())
+
+
+def bench_display(name, display_cls, kwargs, size, msg_key, msg, repeat):
+    display = display_cls(NodePath(name), size, msg, **kwargs)
+    msg_img = display.rasterize(msg)
+    other_img = display.rasterize(msg[::-1])
+    results = {}
+
+    # the transitions of a blank image have no steps, which would measure nothing.
+    for img in (msg_img, other_img):
+        if not has_text(img):
+            raise RuntimeError(f'{name}/{size.x}x{size.y}/{msg_key}: {img.msg!r} has no text rows.')
+
+    def add(bench, times, steps=1):
+        key = f'{name}/{size.x}x{size.y}/{msg_key}/{bench}'
+        results[key] = summarize(times, steps)
+
+    add('create_image', measure(lambda: display.create_image(msg), repeat))
+
+    def prepare():
+        message_cache.clear()
+        display.prepare_for_display(display.render(msg))
+
+    add('prepare_for_display', measure(prepare, repeat))
+
+    # each transition swaps the message with the other one.
+    imgs = [msg_img, other_img]
+    steps = []
+
+    def transition():
+        steps.append(run_transition(display, imgs[len(steps) % 2]))
+
+    times = measure(transition, repeat)
+    add('transition', times)
+    add('transition_step', times, statistics.median(steps))
+
+    def mark_all():
+        display.mark_dirty(slice(None))
+
+    add('update_image', measure(display.update_image, repeat, setup=mark_all))
+
+    default = display.effect
+
+    for effect_name, effect in EFFECTS.items():
+        display.set_effect(effect)
+        steps.clear()
+        times = measure(transition, repeat)
+        add(f'transition_step:{effect_name}', times, statistics.median(steps))
+
+    display.set_effect(default)
+
+    return results
+
+
+def run(repeat, names=None):
+    results = {}
+
+    for name, display_cls, kwargs, sizes in DISPLAYS:
+        if names and name not in names:
+            continue
+
+        for size in sizes:
+            messages = make_messages(display_cls(NodePath(name), size, SHORT, **kwargs))
+
+            for msg_key, msg in messages.items():
+                results.update(bench_display(name, display_cls, kwargs, size, msg_key, msg, repeat))
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the benchmarks whose median is slower than the baseline by more than tolerance.
+    """
+    regressions = []
+
+    for key, result in results.items():
+        if (base := baseline.get(key)) is None:
+            continue
+
+        ratio = result['median_ms'] / base['median_ms'] if base['median_ms'] else 1.0
+
+        if ratio > 1 + tolerance:
+            regressions.append((key, base['median_ms'], result['median_ms'], ratio))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ticker displays without a window.')
+    parser.add_argument('-o', '--output', default='bench_output.json', help='file to write the results to')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='repeats of each benchmark')
+    parser.add_argument('-d', '--display', nargs='*', help='names of displays to benchmark')
+    parser.add_argument('--baseline', help='result file to compare the results with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown ratio')
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.display)
+    meta = dict(
+        python=platform.python_version(),
+        platform=platform.platform(),
+        numpy=np.__version__,
+        panda3d=panda3d.__version__,
+        repeat=args.repeat
+    )
+
+    with open(os.path.join(CWD, args.output), 'w') as f:
+        json.dump(dict(meta=meta, results=results), f, indent=2)
+
+    for key, result in results.items():
+        print(f"{key:60} {result['median_ms']:10.3f} ms")
+
+    if args.baseline:
+        with open(os.path.join(CWD, args.baseline)) as f:
+            baseline = json.load(f)['results']
+
+        if regressions := compare(results, baseline, args.tolerance):
+            print('\nregressions:')
+
+            for key, base, current, ratio in regressions:
+                print(f'{key:60} {base:10.3f} -> {current:10.3f} ms ({ratio:.2f}x)')
+
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Replay a recording of the texture changes of the displays without a window.
+
+    python display_message.py --record session.jsonl.gz
+    python benchmarks/replay_session.py session.jsonl.gz -o replay.json
+    python benchmarks/replay_session.py session.jsonl.gz --display SquareDisplay=my_displays:FastSquareDisplay
+
+The pixels written by every step are compared with the recording, and
+the exit status is 1 if any of them differs.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CWD = os.getcwd()
+sys.path.insert(0, ROOT)
+sys.path.insert(1, CWD)
+# fonts are loaded by relative paths.
+os.chdir(ROOT)
+
+# imported before the window, like in display_message.py, so that Pillow uses its own FreeType.
+from tickers.recorder import Replayer
+
+import panda3d.core as p3d
+from direct.showbase.ShowBase import ShowBase
+
+
+def open_window(window_type):
+    p3d.load_prc_file_data('', f'window-type {window_type}\naudio-library-name null')
+    ShowBase()
+
+
+def load_class(spec):
+    """Return the class of 'module:Class'.
+    """
+    module, name = spec.split(':')
+    return getattr(importlib.import_module(module), name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recording of the displays without a window.')
+    parser.add_argument('recording', help='file written by display_message.py --record')
+    parser.add_argument('-o', '--output', default=None, help='file to write the report to')
+    parser.add_argument('-d', '--display', nargs='*', default=[],
+                        help='replace a recorded display class, like SquareDisplay=module:Class')
+    parser.add_argument('--realtime', action='store_true', help='keep the recorded timing of the events')
+    parser.add_argument('--no-verify', action='store_true', help='do not compare the written pixels')
+    parser.add_argument('--window-type', default='none', choices=['none', 'offscreen'],
+                        help='offscreen to rasterize with the graphics driver loaded')
+    args = parser.parse_args()
+
+    open_window(args.window_type)
+
+    classes = {}
+
+    for spec in args.display:
+        name, cls = spec.split('=')
+        classes[name] = load_class(cls)
+
+    replayer = Replayer(os.path.join(CWD, args.recording), classes)
+    report = replayer.run(verify=not args.no_verify, realtime=args.realtime)
+
+    if args.output:
+        with open(os.path.join(CWD, args.output), 'w') as f:
+            json.dump(report, f, indent=2)
+
+    for key, ops in report['times'].items():
+        for op, stats in ops.items():
+            print(f"{key:4} {op:14} {stats['count']:8} {stats['mean']:10.3f} ms {stats['max']:10.3f} ms max")
+
+    print(f"\n{report['events']} events in {report['seconds']:.2f} s, {report['mismatches']} mismatches")
+
+    for mismatch in report['first_mismatches']:
+        print(mismatch)
+
+    if report['mismatches']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
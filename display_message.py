@@ -1,7 +1,12 @@
-import sys
+import argparse
+import atexit
+import json
 import math
+import sys
+import time
 
 import direct.gui.DirectGuiGlobals as DGG
+import numpy as np
 from direct.gui.DirectGui import DirectEntry, DirectFrame, DirectLabel, DirectButton
 from direct.showbase.ShowBase import ShowBase
 from direct.showbase.ShowBaseGlobal import globalClock
@@ -16,6 +21,15 @@ from lights import BasicAmbientLight
 from tickers.circular_ticker import CircularTicker
 from tickers.square_ticker import SquareTicker
 from tickers.vertical_ticker import VerticalTicker
+from tickers.ticker_manager import TickerManager
+from tickers.assets import assets
+from tickers.lazy_import import import_times
+from tickers.message_cache import message_cache
+from tickers.message_feed import MessageFeed
+from tickers.prerender_cache import prerender_cache
+from tickers.profiling import summarize
+from tickers.recorder import Recorder
+from tickers.transitions import schedules
 from shapes import Sphere
 
 load_prc_file_data("", """
@@ -24,20 +38,61 @@ load_prc_file_data("", """
 """)
 
 
+SCRIPTED_MESSAGES = [
+    'Panda3D',
+    'Enjoy 3D programming.',
+    'Welcome to the ticker displays!',
+    'The quick brown fox jumps over the lazy dog.',
+]
+
+# the kinds of the sources of --feed and the methods of MessageFeed to add them.
+FEED_SOURCES = {
+    'file': 'add_file',
+    'pipe': 'add_pipe',
+    'socket': 'add_unix_socket',
+}
+
+
 class DisplayMessage(ShowBase):
+    """Args:
+        offscreen (bool): render to an offscreen buffer without the gui,
+                          to measure the throughput by run_scripted.
+    """
+
+    def __init__(self, offscreen=False):
+        self.offscreen = offscreen
+        self.startup_times = {}
+        start = time.perf_counter()
+
+        if offscreen:
+            load_prc_file_data('', 'window-type offscreen\naudio-library-name null')
 
-    def __init__(self):
         super().__init__()
         self.disable_mouse()
         self.render.set_antialias(AntialiasAttrib.MAuto)
+        self.startup_times['showbase'] = time.perf_counter() - start
+
+        # loaded in the background while the regions are created.
+        assets.preload(
+            textures=['textures/concrete_01.jpg', 'textures/tile_05.jpg',
+                      'textures/panda3d_logo.png', 'textures/sleeping_panda.png'],
+            models=['models/stagespotlight/stagespotlight'],
+            fonts=[('fonts/Mohave-Bold.ttf', 300)]
+        )
+
+        for name, create in [('create_3d_region', self.create_3d_region),
+                             ('create_2d_region', self.create_2d_region),
+                             ('create_tickers', self.create_tickers),
+                             ('create_sky', self.create_sky)]:
+            t = time.perf_counter()
+            create()
+            self.startup_times[name] = time.perf_counter() - t
 
-        self.create_3d_region()
-        self.create_2d_region()
-        self.create_tickers()
-        self.create_sky()
-        self.gui = Gui()
+        if not offscreen:
+            self.gui = Gui()
 
         self.ambient_light = BasicAmbientLight()
+        self.startup_times['total'] = time.perf_counter() - start
 
         self.accept('escape', sys.exit)
         self.taskMgr.add(self.update, 'update')
@@ -45,22 +100,22 @@ class DisplayMessage(ShowBase):
     def create_tickers(self):
         self.scene = NodePath('scene')
         self.scene.reparent_to(self.render)
-        self.tickers = {}
+        self.tickers = TickerManager(camera=self.cam3d)
 
         c_ticker = CircularTicker('Enjoy 3D programming.')
         c_ticker.set_pos_hpr(Point3(-2.5, -1, 1), Vec3(0, 0, 0))
         c_ticker.reparent_to(self.render)
-        self.tickers['c'] = c_ticker
+        self.tickers.add('c', c_ticker)
 
         s_ticker = SquareTicker('Panda3D')
         s_ticker.set_pos_hpr(Point3(2, 10, 1), Vec3(90, 0, 0))
         s_ticker.reparent_to(self.render)
-        self.tickers['s'] = s_ticker
+        self.tickers.add('s', s_ticker)
 
         v_ticker = VerticalTicker('Welcome')
         v_ticker.set_pos_hpr(Point3(8.5, 2.5, 0), Vec3(35, 0, 0))
         v_ticker.reparent_to(self.render)
-        self.tickers['v'] = v_ticker
+        self.tickers.add('v', v_ticker)
 
     def create_sky(self):
         np = NodePath('skybox')
@@ -85,8 +140,8 @@ class DisplayMessage(ShowBase):
             The range is from 0 to 1.
             0: the left and bottom; 1: the right and top.
         """
-        props = self.win.get_properties()
-        window_size = props.get_size()
+        # buffers have no window properties.
+        window_size = self.win.get_size()
 
         region_w = display_region.y - display_region.x
         region_h = display_region.w - display_region.z
@@ -140,8 +195,9 @@ class DisplayMessage(ShowBase):
         scale = self.calc_scale(region_size)
         self.gui_aspect2d.set_scale(scale)
 
-        mw2d_node = self.create_mouse_watcher('mw2d', region)
-        self.gui_aspect2d.node().set_mouse_watcher(mw2d_node)
+        if not self.offscreen:
+            mw2d_node = self.create_mouse_watcher('mw2d', region)
+            self.gui_aspect2d.node().set_mouse_watcher(mw2d_node)
 
     def create_3d_region(self):
         """Create the region for tickers.
@@ -158,7 +214,9 @@ class DisplayMessage(ShowBase):
 
         self.cam3d.set_pos_hpr(Point3(-14.5, -12, 5), Vec3(-46.565052, -4.648583, 0))
         self.cam3d.reparent_to(self.render)
-        self.display_mw = self.create_mouse_watcher('mw3d', region)
+
+        if not self.offscreen:
+            self.display_mw = self.create_mouse_watcher('mw3d', region)
 
     def create_mouse_watcher(self, name, display_region):
         mw_node = MouseWatcher(name)
@@ -167,10 +225,110 @@ class DisplayMessage(ShowBase):
         mw_node.set_display_region(display_region)
         return mw_node
 
+    def get_ticker_stats(self):
+        """Return the recent mean, p95 and max milliseconds of each section of each ticker.
+        """
+        return {key: ticker.get_stats() for key, ticker in self.tickers.items()}
+
+    def get_queue_stats(self):
+        """Return the queue depth, drops and the latencies of the messages of each ticker.
+        """
+        return {key: ticker.get_queue_stats() for key, ticker in self.tickers.items()}
+
+    def get_startup_report(self):
+        """Return the milliseconds of the startup phases, of loading each asset,
+           and of importing the rasterization backends.
+        """
+        return dict(
+            phases={name: t * 1000 for name, t in self.startup_times.items()},
+            assets=assets.stats(),
+            imports={name: t * 1000 for name, t in import_times.items()}
+        )
+
+    def record(self, path):
+        """Log the texture changes of all displays into path, which can be
+           replayed by benchmarks/replay_session.py; returns the recorder.
+        """
+        recorder = Recorder(path)
+
+        for key, ticker in self.tickers.items():
+            for i, display in enumerate(ticker.get_displays()):
+                recorder.attach(f'{key}{i}', display)
+
+        atexit.register(recorder.close)
+        return recorder
+
+    def start_feed(self, sources):
+        """Post the lines of the sources to the tickers until the app exits; returns the feed.
+            Args:
+                sources (list): (ticker key, kind in FEED_SOURCES, path) of each source.
+        """
+        feed = MessageFeed()
+
+        for key, kind, path in sources:
+            getattr(feed, FEED_SOURCES[kind])(path, self.tickers[key])
+
+        feed.start()
+        atexit.register(feed.stop)
+        return feed
+
+    def get_frame_stats(self):
+        """Return how much message change work was deferred in the recent frames.
+        """
+        return self.tickers.get_stats()
+
+    def run_scripted(self, frames=None, seconds=None, rate=1.0, messages=SCRIPTED_MESSAGES):
+        """Render frames changing the messages of all tickers, and return the report
+           of the fps, the frame time percentiles and the costs of the tickers.
+            Args:
+                frames (int): the number of the frames to render.
+                seconds (float): seconds to run, if frames is None.
+                rate (float): message changes per second of each ticker; 0 for none.
+                messages (list): messages given to the tickers in turn.
+        """
+        interval = 1 / rate if rate else None
+        frame_times = []
+        cnt = 0
+
+        start = last = next_change = time.perf_counter()
+
+        while (len(frame_times) < frames) if frames else (last - start < seconds):
+            if interval and last >= next_change:
+                for ticker in self.tickers.values():
+                    ticker.change_message(messages[cnt % len(messages)])
+
+                cnt += 1
+                next_change += interval
+
+            self.taskMgr.step()
+            now = time.perf_counter()
+            frame_times.append(now - last)
+            last = now
+
+        elapsed = last - start
+        frame_ms = np.array(frame_times) * 1000
+
+        return dict(
+            frames=len(frame_times),
+            seconds=elapsed,
+            fps=len(frame_times) / elapsed,
+            frame_ms=dict(
+                summarize(frame_times),
+                **{f'p{p}': float(np.percentile(frame_ms, p)) for p in (50, 90, 99)}
+            ),
+            messages=cnt * len(self.tickers),
+            startup=self.get_startup_report(),
+            tickers=self.get_ticker_stats(),
+            queues=self.get_queue_stats(),
+            manager=self.get_frame_stats(),
+            message_cache=message_cache.stats(),
+            schedule_cache=schedules.stats(),
+            prerendered=prerender_cache.stats()
+        )
+
     def update(self, task):
         dt = globalClock.get_dt()
-        for ticker in self.tickers.values():
-            ticker.update(dt)
+        self.tickers.update(dt)
 
         return task.cont
 
@@ -242,5 +400,53 @@ class Gui(DirectFrame):
 
 
 if __name__ == '__main__':
-    ticker = DisplayMessage()
-    ticker.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Display messages on the tickers.')
+    parser.add_argument('--offscreen', action='store_true',
+                        help='render offscreen with scripted messages and report the throughput')
+    parser.add_argument('--frames', type=int, default=None, help='frames to render offscreen')
+    parser.add_argument('--seconds', type=float, default=10.0,
+                        help='seconds to run offscreen if --frames is not given')
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help='message changes per second of each ticker')
+    parser.add_argument('-o', '--output', default=None, help='write the report to this JSON file')
+    parser.add_argument('--record', default=None,
+                        help='log the texture changes of the displays into this file')
+    parser.add_argument('--prerendered', default=None,
+                        help='use the message images rendered into this directory by prerender.py')
+    parser.add_argument('--feed', action='append', default=[], metavar='KEY=KIND:PATH',
+                        help='post the lines of a file, pipe or socket to the ticker c, s or v, '
+                             'like s=file:news.log; can be given more than once')
+    args = parser.parse_args()
+    sources = []
+
+    for spec in args.feed:
+        key, _, source = spec.partition('=')
+        kind, _, path = source.partition(':')
+
+        if key not in ('c', 's', 'v') or kind not in FEED_SOURCES or not path:
+            parser.error(f'--feed {spec}: expected KEY=KIND:PATH, like s=file:news.log')
+
+        sources.append((key, kind, path))
+
+    if args.prerendered:
+        prerender_cache.open(args.prerendered)
+
+    ticker = DisplayMessage(offscreen=args.offscreen)
+
+    if args.record:
+        ticker.record(args.record)
+
+    if sources:
+        ticker.start_feed(sources)
+
+    if not args.offscreen:
+        ticker.run()
+    else:
+        report = ticker.run_scripted(args.frames, args.seconds, args.rate)
+        text = json.dumps(report, indent=2)
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(text)
+
+        print(text)
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""Render messages in advance into the on-disk cache of the ticker displays.
+
+    python prerender.py messages.txt -o prerendered
+    python display_message.py --prerendered prerendered
+
+The messages file has a message per line. The images are saved with the
+render settings of the displays in their keys, and the entries already in
+the cache are kept, so only new messages are rendered when run again.
+The effect must be the one that the tickers use, for its schedules to be used.
+
+A model of the app is loaded first, so that the messages are rendered in the
+same state of the process as in the app, and nothing is written unless the
+first message saved and loaded back equals its live render on every display.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from panda3d.core import NodePath, load_prc_file_data
+
+load_prc_file_data('', """
+    window-type none
+    audio-library-name null
+""")
+
+from tickers.assets import get_model
+from tickers.circular_ticker import CircularTicker
+from tickers.square_ticker import SquareTicker
+from tickers.vertical_ticker import VerticalTicker
+from tickers.message_cache import message_cache
+from tickers.prerender_cache import prerender_cache
+from tickers.ticker_displays import SquareDisplay, CircularDisplay, VerticalDisplay
+from tickers.transitions import EFFECTS
+
+
+DISPLAYS = {
+    'square': (SquareDisplay, SquareTicker.display_size, {}),
+    'circular_inner': (CircularDisplay, CircularTicker.display_size, dict(outer=False)),
+    'circular_outer': (CircularDisplay, CircularTicker.display_size, dict(outer=True)),
+    'vertical': (VerticalDisplay, VerticalTicker.display_size, {}),
+}
+
+# loaded by the tickers of the app before they render any message.
+APP_MODEL = 'models/stagespotlight/stagespotlight'
+
+
+def make_display(name, msg, compact=False, effect=None):
+    cls, size, kwargs = DISPLAYS[name]
+
+    if compact and cls is not CircularDisplay:
+        kwargs = dict(kwargs, compact=True)
+
+    display = cls(NodePath(name), size, msg, **kwargs)
+
+    if effect:
+        display.set_effect(EFFECTS[effect])
+
+    return display
+
+
+def verify(display, msg):
+    """Return True if the entry of msg saved in a temporary cache and loaded back
+       equals the image of msg rendered live.
+    """
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as path:
+        prerender_cache.open(path, writable=True)
+        live = display.render(msg)
+        message_cache.clear()
+
+        prerender_cache.open(path)
+        loaded = display.render(msg)
+        prerender_cache.close()
+        message_cache.clear()
+
+        return (live.top, live.btm) == (loaded.top, loaded.btm) \
+            and np.array_equal(live.img.decode(), loaded.img.decode())
+
+
+def prerender(messages, names, compact=False, effect=None):
+    """Render the messages on the displays of the names into prerender_cache.
+    """
+    for name in names:
+        display = make_display(name, messages[0], compact, effect)
+
+        for msg in messages:
+            start = time.perf_counter()
+            display.render(msg)
+            print(f'{name:16} {(time.perf_counter() - start) * 1000:10.3f} ms  {msg}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render messages into the on-disk cache of the displays.')
+    parser.add_argument('messages', help='file of the messages, one per line')
+    parser.add_argument('-o', '--output', default='prerendered', help='cache directory')
+    parser.add_argument('-d', '--display', nargs='*', choices=list(DISPLAYS), default=list(DISPLAYS),
+                        help='names of displays to render for')
+    parser.add_argument('--compact', action='store_true', help='render for the compact square and vertical displays')
+    parser.add_argument('--effect', choices=list(EFFECTS), default=None,
+                        help='effect of the tickers, if not the default of each display')
+    args = parser.parse_args()
+
+    with open(args.messages, encoding='utf-8') as f:
+        messages = [line.rstrip('\n') for line in f if line.strip()]
+
+    if messages:
+        get_model(APP_MODEL)
+        failed = [name for name in args.display
+                  if not verify(make_display(name, messages[0], args.compact, args.effect), messages[0])]
+
+        if failed:
+            sys.exit(f'The saved images differ from the live renders on {", ".join(failed)}; '
+                     'nothing is written.')
+
+        prerender_cache.open(os.path.abspath(args.output), writable=True)
+        prerender(messages, args.display, args.compact, args.effect)
+        print(prerender_cache.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import unittest
+
+from tickers.base_ticker import Size
+from tickers.transitions import Dissolve, RowSweep, ScheduleCache
+
+
+class TestScheduleCache(unittest.TestCase):
+
+    def test_bounded_by_bytes(self):
+        size = Size(64, 32, 3)
+        schedule = Dissolve(pixels=100).make_schedule(size, 31, 0)
+        nbytes = schedule.order.nbytes + schedule.offsets.nbytes
+        cache = ScheduleCache(max_bytes=nbytes * 2)
+
+        for key in range(3):
+            cache.put(key, schedule)
+
+        stats = cache.stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['nbytes'], nbytes * 2)
+        self.assertIsNone(cache.get(0))
+        self.assertIs(cache.get(2), schedule)
+
+    def test_least_recently_used(self):
+        size = Size(64, 32, 3)
+        schedule = RowSweep().make_schedule(size, 31, 0)
+        cache = ScheduleCache(max_bytes=(schedule.order.nbytes + schedule.offsets.nbytes) * 2)
+        cache.put('a', schedule)
+        cache.put('b', schedule)
+        cache.get('a')
+        cache.put('c', schedule)
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
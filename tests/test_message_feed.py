@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+import unittest
+
+from tickers.message_feed import MessageFeed
+
+
+class Ticker:
+
+    def __init__(self):
+        self.msgs = []
+
+    def post_message(self, msg, priority=0):
+        self.msgs.append(msg)
+
+
+def wait_for(cond, timeout=2.0):
+    end = time.monotonic() + timeout
+
+    while not cond() and time.monotonic() < end:
+        time.sleep(0.01)
+
+
+class TestMessageFeed(unittest.TestCase):
+
+    def setUp(self):
+        self.feed = MessageFeed()
+        self.feed.start()
+        self.addCleanup(self.feed.stop)
+        self.ticker = Ticker()
+
+    def test_error_is_reported(self):
+        with self.assertLogs('tickers.message_feed', level='ERROR'):
+            future = self.feed.add_file('/nonexistent/news.log', self.ticker)
+            wait_for(future.done)
+
+        self.assertIsInstance(future.exception(), FileNotFoundError)
+
+    def test_tail_truncated_file(self):
+        with tempfile.TemporaryDirectory() as path:
+            path = os.path.join(path, 'news.log')
+
+            with open(path, 'wb') as f:
+                f.write(b'old\n')
+
+            self.feed.add_file(path, self.ticker, interval=0.01)
+            time.sleep(0.1)
+
+            with open(path, 'ab') as f:
+                f.write(b'first\npartial')
+
+            wait_for(lambda: self.ticker.msgs)
+
+            with open(path, 'wb') as f:
+                f.write(b'new\n')
+
+            wait_for(lambda: len(self.ticker.msgs) > 1)
+            self.feed.stop()
+
+        self.assertEqual(self.ticker.msgs, ['first', 'new'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from tickers.message_queue import MessageQueue, QueuePolicy
+
+
+def drain(queue):
+    msgs = []
+
+    while (item := queue.get()) is not None:
+        msgs.append(item.msg)
+
+    return msgs
+
+
+class TestMessageQueue(unittest.TestCase):
+
+    def test_drop_oldest(self):
+        queue = MessageQueue(maxlen=3, policy=QueuePolicy.DROP_OLDEST)
+
+        for i in range(5):
+            queue.put(f'msg{i}')
+
+        stats = queue.stats()
+        self.assertEqual(stats['received'], 5)
+        self.assertEqual(stats['drops'], 2)
+        self.assertEqual(stats['max_depth'], 3)
+        self.assertEqual(drain(queue), ['msg2', 'msg3', 'msg4'])
+
+    def test_latest(self):
+        queue = MessageQueue(policy=QueuePolicy.LATEST)
+
+        for i in range(3):
+            queue.put(f'msg{i}')
+
+        self.assertEqual(queue.stats()['drops'], 2)
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(drain(queue), ['msg2'])
+
+        queue.put('msg3')
+        self.assertEqual(queue.stats()['drops'], 2)
+        self.assertEqual(drain(queue), ['msg3'])
+
+    def test_priority(self):
+        queue = MessageQueue(maxlen=3, policy=QueuePolicy.PRIORITY)
+
+        for msg, priority in [('a', 0), ('b', 1), ('c', 0), ('d', 2), ('e', 1)]:
+            queue.put(msg, priority)
+
+        # the oldest messages of the lowest priority, a and then c, are dropped.
+        self.assertEqual(queue.stats()['drops'], 2)
+        self.assertEqual(drain(queue), ['d', 'b', 'e'])
+
+    def test_priority_keeps_order_of_same_priority(self):
+        queue = MessageQueue(maxlen=8, policy=QueuePolicy.PRIORITY)
+
+        for msg in 'abc':
+            queue.put(msg, 1)
+
+        self.assertEqual(queue.stats()['drops'], 0)
+        self.assertEqual(drain(queue), ['a', 'b', 'c'])
+
+    def test_latency(self):
+        queue = MessageQueue()
+        queue.put('msg')
+        queue.record_latency(queue.get())
+
+        stats = queue.stats()
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(stats['latency']['count'], 1)
+        self.assertGreaterEqual(stats['latency']['max'], 0)
+        self.assertIsNone(queue.get())
+
+
+if __name__ == '__main__':
+    unittest.main()
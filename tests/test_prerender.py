@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The images of the messages are rendered by prerender.py in a process that
+# has not loaded any models, and by the app after loading them.
+SETUP = """
+    import sys
+    from tickers.base_ticker import Size
+    from tickers.prerender_cache import prerender_cache
+    from tickers.ticker_displays import VerticalDisplay
+    from panda3d.core import Loader, NodePath, load_prc_file_data
+
+    load_prc_file_data('', 'window-type none\\naudio-library-name null')
+"""
+
+PRERENDER = """
+    prerender_cache.open(sys.argv[1], writable=True)
+    display = VerticalDisplay(NodePath('v'), Size(256 * 10, 256 * 2, 3), 'Hello')
+    display.render('Hello')
+"""
+
+COMPARE = """
+    Loader.get_global_ptr().load_sync('models/stagespotlight/stagespotlight')
+    display = VerticalDisplay(NodePath('v'), Size(256 * 10, 256 * 2, 3), 'Hello')
+    prerender_cache.open(sys.argv[1])
+    img, *_ = prerender_cache.load(display.cache_key('Hello'))
+    diff = (img.decode() != display.rasterize('Hello').img.decode()).sum()
+    sys.exit(f'{diff} values differ' if diff else 0)
+"""
+
+
+def run(code, path):
+    return subprocess.run(
+        [sys.executable, '-c', textwrap.dedent(SETUP) + textwrap.dedent(code), path],
+        cwd=ROOT, capture_output=True, text=True
+    )
+
+
+class TestPrerender(unittest.TestCase):
+
+    def test_prerendered_image_equals_live_render(self):
+        with tempfile.TemporaryDirectory() as path:
+            result = run(PRERENDER, path)
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+            result = run(COMPARE, path)
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
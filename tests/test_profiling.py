@@ -0,0 +1,33 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from tickers.profiling import Timer, get_pstat_thread
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_worker_threads_are_not_main(self):
+        # the worker threads share the external thread of Panda3D.
+        main = get_pstat_thread().get_index()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            workers = set(executor.map(lambda _: get_pstat_thread().get_index(), range(8)))
+
+        self.assertNotIn(main, workers)
+        self.assertEqual(get_pstat_thread().get_index(), main)
+
+    def test_timer_in_worker(self):
+        timer = Timer('Tickers:test:section')
+
+        def run():
+            with timer:
+                pass
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(run).result()
+
+        self.assertEqual(timer.stats()['count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
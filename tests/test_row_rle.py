@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+from tickers.row_rle import RowRLEImage
+
+
+def make_image(h=24, w=40, z=3, seed=0):
+    """Return an image of the background with some runs of text colors,
+       and pixels that differ from their left neighbours in one channel only.
+    """
+    rng = np.random.default_rng(seed)
+    img = np.zeros((h, w, z), dtype=np.uint8)
+    img[:] = (10, 20, 30)[:z]
+
+    for _ in range(30):
+        y, x = rng.integers(h), rng.integers(w)
+        img[y, x:x + rng.integers(1, 8)] = rng.integers(256, size=z)
+
+    img[3, 5, -1] += 1
+    img[7] = rng.integers(256, size=(w, z))
+    return img
+
+
+class TestRowRLEImage(unittest.TestCase):
+
+    def setUp(self):
+        self.img = make_image()
+        self.rle = RowRLEImage.encode(self.img)
+
+    def test_round_trip(self):
+        for img in [self.img, make_image(z=1), make_image()[7:8], np.zeros((4, 6, 3), dtype=np.uint8)]:
+            with self.subTest(shape=img.shape):
+                np.testing.assert_array_equal(RowRLEImage.encode(img).decode(), img)
+
+    def test_runs(self):
+        # a run for each row of the background only.
+        img = np.zeros((4, 6, 3), dtype=np.uint8)
+        self.assertEqual(len(RowRLEImage.encode(img).colors), 4)
+        self.assertLess(self.rle.nbytes, self.img.nbytes)
+
+    def test_int(self):
+        for y in [0, 3, 7, -1]:
+            with self.subTest(y=y):
+                np.testing.assert_array_equal(self.rle[y], self.img[y])
+
+        np.testing.assert_array_equal(self.rle[np.int64(5)], self.img[5])
+
+        with self.assertRaises(IndexError):
+            self.rle[self.img.shape[0]]
+
+    def test_slice(self):
+        for key in [slice(None), slice(2, 9), slice(9, 2), slice(-5, None), slice(1, 20, 3), slice(None, None, -2)]:
+            with self.subTest(key=key):
+                np.testing.assert_array_equal(self.rle[key], self.img[key])
+
+    def test_rows(self):
+        for rows in [[7, 0, 3, 3, -2], np.array([], dtype=int), np.flatnonzero(self.img[:, 0, 0] != 10)]:
+            with self.subTest(rows=rows):
+                np.testing.assert_array_equal(self.rle[rows], self.img[rows])
+
+    def test_rows_and_cols(self):
+        cols = np.array([0, 5, 6, 39])
+        np.testing.assert_array_equal(self.rle[2:9, cols], self.img[2:9][:, cols])
+        np.testing.assert_array_equal(self.rle[::4, cols], self.img[::4][:, cols])
+
+        rows = np.array([7, 3, 0])
+        np.testing.assert_array_equal(self.rle[np.ix_(rows, cols)], self.img[np.ix_(rows, cols)])
+
+        ys, xs = np.array([3, 7, 7]), np.array([5, 0, 39])
+        np.testing.assert_array_equal(self.rle[ys, xs], self.img[ys, xs])
+
+    def test_get_pixels(self):
+        idx = np.sort(np.random.default_rng(1).choice(self.img.shape[0] * self.img.shape[1], 100))
+        np.testing.assert_array_equal(
+            self.rle.get_pixels(idx), self.img.reshape(-1, self.img.shape[2])[idx])
+
+
+if __name__ == '__main__':
+    unittest.main()
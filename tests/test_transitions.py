@@ -0,0 +1,166 @@
+import unittest
+
+import numpy as np
+from panda3d.core import NodePath, load_prc_file_data
+
+from tickers.base_ticker import Size, TransitionScheduler
+from tickers.ticker_displays import CircularDisplay, SquareDisplay, VerticalDisplay
+from tickers.transitions import EFFECTS
+
+
+load_prc_file_data('', 'window-type none\naudio-library-name null')
+
+# as high as the displays of the tickers, which lay out the text for the height.
+SIZE = Size(256 * 3, 256 * 2, 3)
+
+DISPLAYS = [
+    (SquareDisplay, {}),
+    (SquareDisplay, dict(compact=True)),
+    (SquareDisplay, dict(shared=True)),
+    (SquareDisplay, dict(double_buffered=True)),
+    (CircularDisplay, {}),
+    (CircularDisplay, dict(outer=False, shared=True)),
+    (CircularDisplay, dict(double_buffered=True)),
+    (VerticalDisplay, {}),
+    (VerticalDisplay, dict(compact=True)),
+    (VerticalDisplay, dict(shared=True)),
+    (VerticalDisplay, dict(double_buffered=True)),
+]
+
+# the old and the new messages; the same message keeps all the rows.
+CHANGES = [('Panda', 'Hi 3D'), ('Panda', 'Panda')]
+
+# when the new message is rendered: before the first step, halfway or after the deletion.
+KEEPS = ['early', 'halfway', 'late']
+
+
+def change_message(display, msg, keep):
+    """Delete the message of display and display msg, like a ticker does.
+    """
+    msg_img = display.render(msg)
+    display.prepare_for_deletion()
+    # compared on the worker thread with the rendering.
+    diff = display.compare_rows(msg_img)
+    steps = display.count_steps()
+    keep_step = dict(early=0, halfway=steps // 2, late=steps)[keep]
+    step = 0
+
+    while True:
+        if step == keep_step:
+            display.keep_rows(msg_img, diff)
+
+        if display.delete_msg(step):
+            break
+
+        step += 1
+
+    if keep_step >= step:
+        display.keep_rows(msg_img, diff)
+
+    display.prepare_for_display(msg_img)
+    step = 0
+
+    while not display.display_msg(step):
+        step += 1
+
+
+class TestTransition(unittest.TestCase):
+
+    def test_converges_to_fresh_render(self):
+        for cls, kwargs in DISPLAYS:
+            ref_kwargs = {k: v for k, v in kwargs.items() if k not in ('shared', 'double_buffered')}
+
+            for old, new in CHANGES:
+                expected = cls(NodePath('ref'), SIZE, new, **ref_kwargs).img.copy()
+
+                for effect in EFFECTS:
+                    for keep in KEEPS:
+                        with self.subTest(cls=cls.__name__, kwargs=kwargs, msgs=(old, new), effect=effect, keep=keep):
+                            display = cls(NodePath('display'), SIZE, old, **kwargs)
+                            display.set_effect(EFFECTS[effect])
+                            change_message(display, new, keep)
+
+                            self.assertIsNone(display.transition)
+                            np.testing.assert_array_equal(display.img, expected)
+
+    def test_keep_leaves_deleted_rows(self):
+        for cls, kwargs in DISPLAYS:
+            for effect in EFFECTS:
+                with self.subTest(cls=cls.__name__, kwargs=kwargs, effect=effect):
+                    display = cls(NodePath('display'), SIZE, 'Panda', **kwargs)
+                    display.set_effect(EFFECTS[effect])
+                    msg_img = display.render('Panda')
+                    display.prepare_for_deletion()
+
+                    for step in range(display.count_steps() // 2):
+                        display.delete_msg(step)
+
+                    if display.double_buffered:
+                        # the rows that the mask has begun to reveal the background on.
+                        rows = display.mask_img.reshape(SIZE.y, -1).any(axis=1)
+                        img = display.back_img
+                    else:
+                        rows = slice(None)
+                        img = display.img
+
+                    before = img[rows].copy()
+                    display.keep_rows(msg_img)
+                    # the rows shared by the messages, which are partly deleted, do not show up again.
+                    np.testing.assert_array_equal(img[rows], before)
+                    self.assertFalse(display.kept.all())
+
+    def test_messages_have_text(self):
+        for cls, kwargs in DISPLAYS:
+            display = cls(NodePath('display'), SIZE, 'Panda', **kwargs)
+
+            for msg in {msg for change in CHANGES for msg in change}:
+                with self.subTest(cls=cls.__name__, msg=msg):
+                    msg_img = display.render(msg)
+                    self.assertGreaterEqual(msg_img.top, msg_img.btm)
+
+
+class TestTransitionScheduler(unittest.TestCase):
+
+    def run_phase(self, total_steps, dt, budget=1.0):
+        """Return the frames and the steps done until the phase finishes.
+        """
+        scheduler = TransitionScheduler(duration=1.0, budget=budget)
+        scheduler.start(total_steps)
+        steps = []
+
+        def do_step(step):
+            steps.append(step)
+            return step == total_steps - 1
+
+        frames = 1
+
+        while not scheduler.run(dt, do_step):
+            frames += 1
+
+        return frames, steps
+
+    def test_frame_rate_independent(self):
+        for fps in [24, 30, 60, 144, 240]:
+            with self.subTest(fps=fps):
+                frames, steps = self.run_phase(100, 1 / fps)
+                # the phase takes the duration, to a frame, at any frame rate.
+                self.assertAlmostEqual(frames / fps, 1.0, delta=1 / fps + 1e-9)
+                self.assertEqual(steps, list(range(100)))
+
+    def test_budget_defers_steps(self):
+        # a step over the budget ends the frame; the remaining steps are done later.
+        frames, steps = self.run_phase(100, 1 / 10, budget=0)
+        self.assertEqual(frames, 100)
+        self.assertEqual(steps, list(range(100)))
+
+    def test_defer(self):
+        scheduler = TransitionScheduler(duration=1.0, budget=1.0)
+        scheduler.start(60)
+        steps = []
+        scheduler.defer(0.5)
+        scheduler.run(0.0, steps.append)
+        self.assertEqual(len(steps), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
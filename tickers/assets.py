@@ -0,0 +1,93 @@
+import threading
+import time
+
+from panda3d.core import AsyncTaskManager, Filename, Loader, NodePath, PythonTask, TexturePool
+# Imported with the tickers, before Panda3D loads a model or a graphics driver,
+# which can load another FreeType that Pillow would then use to rasterize text;
+# the fonts would be rendered differently by the state of the process.
+from PIL import ImageFont
+
+
+class AssetCache:
+    """Futures of the textures, models and fonts used by the tickers, by their paths.
+       The assets are loaded on the task chain of the Panda3D loader, and the models
+       and the textures are cached by ModelPool and TexturePool; the futures only let
+       preload start loading them before they are needed, and the first user wait for them.
+       Loader.load_model(blocking=False) is not used, because it passes the model
+       through the messenger of the main loop, which is not running at startup.
+    """
+
+    def __init__(self):
+        self.loader = Loader.get_global_ptr()
+        self.entries = {}
+        self.load_times = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, load, *args):
+        """Return the future of the asset; its result() waits for the asset to be loaded.
+        """
+        with self.lock:
+            if (task := self.entries.get(key)) is None:
+                task = self.entries[key] = PythonTask(self.timed_load(key, load, *args), 'load_asset')
+                task.set_task_chain(self.loader.get_task_chain())
+                AsyncTaskManager.get_global_ptr().add(task)
+
+        return task
+
+    async def timed_load(self, key, load, *args):
+        start = time.perf_counter()
+
+        if (asset := load(*args)) is None:
+            raise IOError(f'Could not load {key[0]}: {key[1]}')
+
+        self.load_times[key] = time.perf_counter() - start
+        return asset
+
+    def load_texture(self, path):
+        return self.get(('texture', path), TexturePool.load_texture, path)
+
+    def load_model(self, path):
+        return self.get(('model', path), self.loader.load_sync, Filename(path))
+
+    def load_font(self, path, size):
+        return self.get(('font', path, size), ImageFont.truetype, path, size)
+
+    def preload(self, textures=(), models=(), fonts=()):
+        """Start loading the assets in the background.
+            Args:
+                textures (list): texture paths.
+                models (list): model paths.
+                fonts (list): (path, size) of fonts.
+        """
+        for path in textures:
+            self.load_texture(path)
+
+        for path in models:
+            self.load_model(path)
+
+        for path, size in fonts:
+            self.load_font(path, size)
+
+    def stats(self):
+        """Return the milliseconds that each asset took to load.
+        """
+        return {':'.join(str(k) for k in key): t * 1000 for key, t in list(self.load_times.items())}
+
+
+assets = AssetCache()
+
+
+def get_texture(path):
+    """Return the shared texture; load it if not loaded yet.
+    """
+    return assets.load_texture(path).result()
+
+
+def get_model(path):
+    """Return the shared model; instance it to use in the scene.
+    """
+    return NodePath(assets.load_model(path).result())
+
+
+def get_font(path, size):
+    return assets.load_font(path, size).result()
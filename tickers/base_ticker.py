@@ -1,9 +1,19 @@
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum, auto
 from typing import NamedTuple
 
 from panda3d.core import NodePath, PandaNode
 
+from .message_queue import MessageQueue
+from .profiling import Profiler
+
+
+# Messages are rasterized on worker threads not to stop frame updates;
+# cv2 releases the GIL while drawing.
+executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ticker_render')
+
 
 class Process(Enum):
 
@@ -27,13 +37,73 @@ class Size(NamedTuple):
         return self.x * self.z
 
 
+class TransitionScheduler:
+    """Convert the elapsed time into the steps of a transition, so that
+       the transition takes the same time at any frame rate.
+        Args:
+            duration (float): seconds that a transition phase takes.
+            budget (float): seconds of CPU time that steps can use in a frame;
+                the steps over the budget are deferred to the next frames.
+    """
+
+    def __init__(self, duration, budget):
+        self.duration = duration
+        self.budget = budget
+        self.start(0)
+
+    def start(self, total_steps):
+        """total_steps: the number of the calls of do_step, including
+           the last one that returns True.
+        """
+        self.rate = total_steps / self.duration
+        self.work = 0.0
+        self.step = 0
+
+    def defer(self, dt):
+        """Add the work of dt seconds without doing it; it is done in the next runs.
+        """
+        self.work += dt * self.rate
+
+    def run(self, dt, do_step, budget=None):
+        """Args:
+            dt (float): seconds since the last frame.
+            do_step (callable): called with the step index; returns True
+                when the phase has finished.
+            budget (float): seconds of CPU time left in this frame, if less than self.budget.
+           Returns True when the phase has finished.
+        """
+        self.work += dt * self.rate
+        budget = self.budget if budget is None else min(self.budget, budget)
+        start = time.perf_counter()
+
+        while self.work >= 1:
+            self.work -= 1
+
+            if do_step(self.step):
+                return True
+
+            self.step += 1
+
+            if time.perf_counter() - start > budget:
+                break
+
+        return False
+
+
 class BaseTicker(ABC):
 
-    def __init__(self, name):
+    def __init__(self, name, duration=1.0, budget=0.004):
         self.root = NodePath(PandaNode(name))
         self.next_msg = None
         self.process = None
-        self.counter = 0
+        self.future = None
+        self.rows_kept = False
+        self.scheduler = TransitionScheduler(duration, budget)
+        # each ticker keeps its own samples; the PStats collectors of the same name are shared.
+        self.profiler = Profiler(name)
+        # replace it to change the size or the policy.
+        self.queue = MessageQueue()
+        self.queued = None
 
     @abstractmethod
     def create_ticker(self, msg):
@@ -41,14 +111,206 @@ class BaseTicker(ABC):
         """
 
     @abstractmethod
-    def change_message(self, msg):
-        """If a message is typed in the entry, starts processing.
+    def render_new_msg(self, msg):
+        """Create the images of the new message in the order of get_displays.
+           Called from a worker thread.
+        """
+
+    @abstractmethod
+    def count_steps(self):
+        """Return the number of the calls of delete_old_msg or display_new_msg
+           to delete or display a message, including the last one that returns True.
         """
 
     @abstractmethod
+    def delete_old_msg(self, step):
+        """Delete a part of the old message; returns True when finished.
+        """
+
+    @abstractmethod
+    def prepare_new_msg(self):
+        """Pass the rendered images of the new message to the displays.
+        """
+
+    @abstractmethod
+    def display_new_msg(self, step):
+        """Display a part of the new message; returns True when finished.
+        """
+
+    @abstractmethod
+    def move_letters(self, dt):
+        """Move the message in the display.
+        """
+
+    @abstractmethod
+    def update_image(self):
+        """Upload the changed textures; called once per frame.
+           Returns the number of the uploaded textures.
+        """
+
+    @abstractmethod
+    def get_displays(self):
+        """Return the displays of this ticker.
+        """
+
+    def change_message(self, msg, priority=0):
+        """Queue the message, and start processing it if the ticker is idle.
+           Must be called from the main thread.
+        """
+        self.post_message(msg, priority)
+        self.poll_messages()
+
+    def post_message(self, msg, priority=0):
+        """Queue the message; it is started by poll_messages in the next frame.
+           Can be called from any thread.
+        """
+        self.queue.put(msg, priority)
+
+    def poll_messages(self):
+        """Start the next queued message if the ticker is idle; called once per frame.
+        """
+        if not self.process and (item := self.queue.get()):
+            self.queued = item
+            self.start_message(item.msg)
+
+    def start_message(self, msg):
+        for display in self.get_displays():
+            display.stop_marquee()
+            display.prepare_for_deletion()
+
+        self.process = Process.DELETE
+        self.next_msg = msg
+        self.rows_kept = False
+        self.start_rendering(msg)
+        self.scheduler.start(self.count_steps())
+
+    def start_rendering(self, msg):
+        """Start creating the images of the new message in the background,
+           while the old message is being deleted.
+        """
+        self.future = executor.submit(self.render_and_compare, msg)
+
+    def render_and_compare(self, msg):
+        """Return the images of the new message and their rows compared with
+           the old message on each display. Called from a worker thread.
+        """
+        rendered = self.render_new_msg(msg)
+        return rendered, [display.compare_rows(msg_img)
+                          for display, msg_img in zip(self.get_displays(), rendered)]
+
+    def is_rendered(self):
+        return self.future is not None and self.future.done()
+
+    def get_rendered(self):
+        rendered, _ = self.future.result()
+        self.future = None
+        return rendered
+
+    def keep_rows(self):
+        """Stop deleting the rows that the old and the new messages share,
+           once the new message has been rendered.
+        """
+        self.rows_kept = True
+        rendered, diffs = self.future.result()
+
+        for display, msg_img, diff in zip(self.get_displays(), rendered, diffs):
+            display.keep_rows(msg_img, diff)
+
     def update(self, dt):
-        """Update ticker display.
+        """Update ticker display. The shared texture pages are not uploaded here;
+           call texture_pool.flush once per frame after updating all tickers.
+        """
+        with self.profiler.timer('update'):
+            self.poll_messages()
+            self.animate(dt)
+            self.transit(dt)
+            self.upload()
+
+    def animate(self, dt):
+        with self.profiler.timer('update:move_letters'):
+            self.move_letters(dt)
+
+    def transit(self, dt, budget=None):
+        """Advance the message change by dt seconds.
+            Args:
+                budget (float): seconds of CPU time left in this frame.
+        """
+        match self.process:
+
+            case Process.DELETE:
+                with self.profiler.timer('update:delete'):
+                    if not self.rows_kept and self.is_rendered():
+                        self.keep_rows()
+
+                    if self.scheduler.run(dt, self.delete_old_msg, budget):
+                        self.process = Process.PREPARE
+
+            case Process.PREPARE:
+                if self.is_rendered():
+                    with self.profiler.timer('update:prepare'):
+                        # the displays get the compared rows with the kept ones.
+                        if not self.rows_kept:
+                            self.keep_rows()
+
+                        self.prepare_new_msg()
+                        self.scheduler.start(self.count_steps())
+                        self.process = Process.DISPLAY
+
+            case Process.DISPLAY:
+                with self.profiler.timer('update:display'):
+                    if self.scheduler.run(dt, self.display_new_msg, budget):
+                        self.process = None
+                        self.queue.record_latency(self.queued)
+                        self.queued = None
+
+    def defer(self, dt):
+        """Skip the message change in this frame, keeping its work for the next frames.
+        """
+        if self.process in (Process.DELETE, Process.DISPLAY):
+            self.scheduler.defer(dt)
+
+    def upload(self):
+        with self.profiler.timer('update:update_image'):
+            return self.update_image()
+
+    def start_marquee(self, feed):
+        """Scroll the texts of feed, an iterable of str, until a new message is started.
+           Returns False if the ticker is changing its message.
+        """
+        if self.process:
+            return False
+
+        for display in self.get_displays():
+            display.start_marquee(feed)
+
+        return True
+
+    def set_effect(self, effect):
+        """Change the transition effect of the displays from the next message.
+        """
+        for display in self.get_displays():
+            display.set_effect(effect)
+
+    def update_view(self, camera, lod_sizes):
+        """Update the visibility and the texture level of the displays from the camera;
+           returns True if any of the displays is visible.
+        """
+        visible = False
+
+        for display in self.get_displays():
+            visible |= display.update_view(camera, lod_sizes)
+
+        return visible
+
+    def get_stats(self):
+        """Return the recent mean, p95 and max milliseconds of each section.
+        """
+        return self.profiler.stats()
+
+    def get_queue_stats(self):
+        """Return the depth, drops and the latencies from receiving to displaying messages.
         """
+        return self.queue.stats()
 
     def set_pos_hpr(self, pos, hpr):
         self.root.set_pos_hpr(pos, hpr)
@@ -1,23 +1,27 @@
 from panda3d.core import NodePath
 from panda3d.core import Point3, Vec3
 
-from .base_ticker import Process, Size, BaseTicker
+from .assets import get_texture
+from .base_ticker import Size, BaseTicker
 from .ticker_displays import CircularDisplay
 from .models import CylinderModel
 
 
 class CircularTicker(BaseTicker):
 
-    def __init__(self, msg):
-        super().__init__('circular_ticker')
-        self.create_ticker(msg)
+    # the texture size of the displays, which prerender.py also uses.
+    display_size = Size(256 * 20, 256 * 2, 3)
 
-    def create_ticker(self, msg):
+    def __init__(self, msg, shared=False, double_buffered=False):
+        super().__init__('circular_ticker', duration=1.0)
+        self.create_ticker(msg, shared, double_buffered)
+
+    def create_ticker(self, msg, shared=False, double_buffered=False):
         self.ticker_display = NodePath("ticker_display")
         self.ticker_display.reparent_to(self.root)
 
         framework = NodePath('framework')
-        framework.set_texture(base.loader.load_texture('textures/concrete_01.jpg'))
+        framework.set_texture(get_texture('textures/concrete_01.jpg'))
         framework.reparent_to(self.ticker_display)
 
         rad = 4.48
@@ -38,59 +42,43 @@ class CircularTicker(BaseTicker):
             model.reparent_to(framework)
 
         ticker = NodePath('ticker')
-        size = Size(256 * 20, 256 * 2, 3)
+        size = self.display_size
         self.tickers = []
 
         for i, (rad, is_outer) in enumerate([[4.0, False], [4.5, True]]):
             model = CylinderModel(f'ticker_{i}', radius=rad, height=1)
             model.reparent_to(ticker)
-            display = CircularDisplay(model, size, msg, outer=is_outer)
+            display = CircularDisplay(
+                model, size, msg, outer=is_outer, shared=shared, double_buffered=double_buffered)
+            display.profiler = self.profiler
             self.tickers.append(display)
 
         ticker.reparent_to(self.ticker_display)
 
-    def change_message(self, msg):
-        if not self.process:
-            self.process = Process.DELETE
-            self.next_msg = msg
+    def count_steps(self):
+        return max(t.count_steps() for t in self.tickers)
 
-    def delete_old_msg(self):
-        if all([t.delete_msg(self.counter) for t in self.tickers]):
-            self.counter = 0
-            return True
+    def delete_old_msg(self, step):
+        return all([t.delete_msg(step) for t in self.tickers])
 
-        self.counter += 1
+    def render_new_msg(self, msg):
+        return [t.render(msg) for t in self.tickers]
 
     def prepare_new_msg(self):
-        for t in self.tickers:
-            t.prepare_for_display(self.next_msg)
+        for t, msg_img in zip(self.tickers, self.get_rendered()):
+            t.prepare_for_display(msg_img)
 
         self.next_msg = None
 
-    def display_new_msg(self):
-        if all([t.display_msg(self.counter) for t in self.tickers]):
-            self.counter = 0
-            return True
-
-        self.counter += 1
+    def display_new_msg(self, step):
+        return all([t.display_msg(step) for t in self.tickers])
 
-    def rotate_display(self, dt):
+    def move_letters(self, dt):
         for t in self.tickers:
             t.move_letters(dt)
 
-    def update(self, dt):
-        self.rotate_display(dt)
-
-        match self.process:
-
-            case Process.DELETE:
-                if self.delete_old_msg():
-                    self.process = Process.PREPARE
-
-            case Process.PREPARE:
-                self.prepare_new_msg()
-                self.process = Process.DISPLAY
+    def update_image(self):
+        return sum(t.update_image() for t in self.tickers)
 
-            case Process.DISPLAY:
-                if self.display_new_msg():
-                    self.process = None
\ No newline at end of file
+    def get_displays(self):
+        return self.tickers
@@ -0,0 +1,200 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+import numpy as np
+# not imported lazily, for the same FreeType as in assets.py.
+from PIL import Image, ImageDraw
+
+from .lazy_import import lazy_import
+
+
+# imported when the first glyph of the backend is drawn.
+cv2 = lazy_import('cv2')
+
+
+class Glyph(NamedTuple):
+
+    mask: np.ndarray    # coverage of the glyph, 0 to 255.
+    left: int           # x offset of the mask from the pen position.
+    top: int            # y offset of the mask from the pen position.
+    advance: float
+    ink_rows: tuple = None  # [start, stop) rows of the mask that have coverage.
+
+
+class GlyphAtlas(ABC):
+    """Rasterize each glyph once, and compose texts by copying the glyphs
+       into a coverage mask with NumPy.
+    """
+
+    def __init__(self):
+        self.glyphs = {}
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def rasterize_glyph(self, char):
+        """Return the Glyph of char.
+        """
+
+    def get_glyph(self, char):
+        if (glyph := self.glyphs.get(char)) is None:
+            glyph = self.rasterize_glyph(char)
+
+            if (rows := np.flatnonzero(glyph.mask.any(axis=1))).size:
+                glyph = glyph._replace(ink_rows=(int(rows[0]), int(rows[-1]) + 1))
+
+            with self.lock:
+                self.glyphs[char] = glyph
+
+        return glyph
+
+    def get_text_width(self, text):
+        return int(round(sum(self.get_glyph(char).advance for char in text)))
+
+    def get_ink_rows(self, text):
+        """Return the [start, stop) rows that the glyphs of text cover,
+           relative to the pen position, or None if no glyphs have coverage.
+        """
+        rows = [(glyph.top + glyph.ink_rows[0], glyph.top + glyph.ink_rows[1])
+                for glyph in map(self.get_glyph, text) if glyph.ink_rows]
+
+        if not rows:
+            return None
+
+        return min(start for start, _ in rows), max(stop for _, stop in rows)
+
+    def layout(self, text):
+        """Return the glyphs of text and their x positions relative to the pen position.
+        """
+        pen_x = 0
+        glyphs = []
+
+        for char in text:
+            glyph = self.get_glyph(char)
+            glyphs.append((glyph, math.floor(pen_x + 0.5)))
+            pen_x += glyph.advance
+
+        return glyphs
+
+    def draw_text(self, mask, text, org):
+        """Args:
+            mask (numpy.ndarray): 2D uint8 coverage mask to draw the text into.
+            text (str): the text to be drawn.
+            org (tuple): the pen position of the first glyph, the same as
+                the one passed to the original text drawing function.
+        """
+        org_x, org_y = org
+
+        for glyph, x in self.layout(text):
+            blit(mask, glyph.mask, org_x + x + glyph.left, org_y + glyph.top)
+
+    def draw_tiled_text(self, mask, text, xs, y):
+        """Draw text once into a strip and copy the strip to each pen position
+           (x, y) for x in xs. The result is the same as draw_text for each x.
+        """
+        if not (glyphs := self.layout(text)):
+            return
+
+        left = min(x + glyph.left for glyph, x in glyphs)
+        right = max(x + glyph.left + glyph.mask.shape[1] for glyph, x in glyphs)
+        top = min(glyph.top for glyph, _ in glyphs)
+        bottom = max(glyph.top + glyph.mask.shape[0] for glyph, _ in glyphs)
+        strip = np.zeros((bottom - top, right - left), dtype=np.uint8)
+
+        for glyph, x in glyphs:
+            blit(strip, glyph.mask, x + glyph.left - left, glyph.top - top)
+
+        for x in xs:
+            blit(mask, strip, x + left, y + top)
+
+
+class CV2GlyphAtlas(GlyphAtlas):
+    """Glyphs of Hershey fonts drawn by cv2.putText; the pen position is
+       the bottom-left corner of the text, the same as cv2.putText.
+    """
+
+    def __init__(self, font_face, scale, thickness):
+        super().__init__()
+        self.font_face = font_face
+        self.scale = scale
+        self.thickness = thickness
+
+    def rasterize_glyph(self, char):
+        (w, h), baseline = cv2.getTextSize(char, self.font_face, self.scale, self.thickness)
+        pad = self.thickness + 2
+        mask = np.zeros((h + baseline + pad * 2, w + pad * 2), dtype=np.uint8)
+        cv2.putText(mask, char, (pad, pad + h), self.font_face, self.scale, 255, thickness=self.thickness)
+
+        # cv2.getTextSize rounds the width, so measure the advance
+        # over repeated glyphs not to accumulate rounding errors.
+        n = 64
+        (width, _), _ = cv2.getTextSize(char * n, self.font_face, self.scale, self.thickness)
+        advance = (width - self.thickness) / n
+
+        return Glyph(mask, -pad, -(pad + h), advance)
+
+
+class PILGlyphAtlas(GlyphAtlas):
+    """Glyphs of a FreeType font drawn by PIL; the pen position is
+       the left-ascender of the text, the same as ImageDraw.text.
+    """
+
+    def __init__(self, font, stroke_width=0):
+        super().__init__()
+        self.font = font
+        self.stroke_width = stroke_width
+
+    def rasterize_glyph(self, char):
+        left, top, right, bottom = self.font.getbbox(char, stroke_width=self.stroke_width)
+        mask = np.zeros((max(bottom - top, 0), max(right - left, 0)), dtype=np.uint8)
+
+        if mask.size:
+            img = Image.new('L', (mask.shape[1], mask.shape[0]))
+            ImageDraw.Draw(img).text(
+                (-left, -top), char, fill=255, font=self.font, stroke_width=self.stroke_width)
+            mask = np.array(img)
+
+        return Glyph(mask, left, top, self.font.getlength(char))
+
+
+def blit(dest, src, x, y):
+    """Composite the coverage mask src onto dest at (x, y) by taking the maximum.
+       src is clipped to dest.
+    """
+    h, w = dest.shape
+    sh, sw = src.shape
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + sw, w), min(y + sh, h)
+
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    area = dest[y0:y1, x0:x1]
+    np.maximum(area, src[y0 - y:y1 - y, x0 - x:x1 - x], out=area)
+
+
+def make_color_table(bg_color, text_color):
+    """Return the (256, 3) table to convert coverage masks to color images
+       by table[mask], blending bg_color and text_color.
+    """
+    alpha = np.arange(256, dtype=np.float64)[:, None] / 255
+    bg = np.array(bg_color, dtype=np.float64)
+    fg = np.array(text_color, dtype=np.float64)
+    return np.rint(bg + (fg - bg) * alpha).astype(np.uint8)
+
+
+atlases = {}
+atlases_lock = threading.Lock()
+
+
+def get_atlas(atlas_cls, *args):
+    """Return the atlas shared by the displays that have the same font settings.
+    """
+    key = (atlas_cls, *args)
+
+    with atlases_lock:
+        if (atlas := atlases.get(key)) is None:
+            atlas = atlases[key] = atlas_cls(*args)
+
+    return atlas
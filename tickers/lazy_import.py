@@ -0,0 +1,32 @@
+import importlib
+import time
+
+
+import_times = {}
+
+
+class LazyModule:
+    """Import the module when one of its attributes is first used, so that
+       the rasterization backends that are not used are never imported.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+
+    def load(self):
+        if self.module is None:
+            start = time.perf_counter()
+            # import_module is thread-safe; the import lock serializes the first calls.
+            module = importlib.import_module(self.name)
+            import_times.setdefault(self.name, time.perf_counter() - start)
+            self.module = module
+
+        return self.module
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+
+def lazy_import(name):
+    return LazyModule(name)
@@ -0,0 +1,123 @@
+import bisect
+from collections import deque
+
+import numpy as np
+
+from .glyph_atlas import blit
+
+
+class Piece:
+    """A text of the feed laid out from the stream column start.
+    """
+
+    def __init__(self, start, glyphs, width):
+        self.glyphs = glyphs
+        # pen positions in stream columns, which are sorted unlike the mask edges.
+        self.pens = [start + x for _, x in glyphs]
+        # how far the masks reach to the right and the left of the pens.
+        self.max_right = max((glyph.left + glyph.mask.shape[1] for glyph, _ in glyphs), default=0)
+        self.max_left = max((-glyph.left for glyph, _ in glyphs), default=0)
+        self.end = start + width
+        self.right = max(self.end, start + max((x for _, x in glyphs), default=0) + self.max_right)
+
+    def draw(self, mask, a, y):
+        """Draw the glyphs overlapping the stream columns a to a + mask width.
+        """
+        b = a + mask.shape[1]
+        i = bisect.bisect_right(self.pens, a - self.max_right)
+        j = bisect.bisect_left(self.pens, b + self.max_left)
+
+        for pen, (glyph, _) in zip(self.pens[i:j], self.glyphs[i:j]):
+            blit(mask, glyph.mask, pen + glyph.left - a, y + glyph.top)
+
+
+class Marquee:
+    """Scroll the texts of a feed through the texture of a display, which is
+       used as a ring buffer: the texture shows the last size.x columns of
+       an endless strip of the texts, and only the columns that scroll past
+       the seam are drawn, so the cost does not depend on the feed length.
+        Args:
+            display (Ticker): a display that scrolls its texture by msg_offset.
+            feed (iterable): texts to scroll; blank columns follow when it ends.
+    """
+
+    def __init__(self, display, feed):
+        self.display = display
+        self.feed = iter(feed)
+        self.pieces = deque()
+        self.end = 0     # the stream column where the next piece starts.
+        self.pos = 0     # the stream columns written so far.
+        self.head = 0    # the texture column of the seam.
+        self.pen_y = 0
+
+    def next_piece(self):
+        if (text := next(self.feed, None)) is None:
+            self.end = float('inf')
+            return
+
+        if not text:
+            return
+
+        text, _, self.pen_y = self.display.layout_msg(text)
+        atlas = self.display.atlas
+        piece = Piece(self.end, atlas.layout(text), atlas.get_text_width(text))
+        self.pieces.append(piece)
+        self.end = piece.end
+
+    def draw_columns(self, n):
+        """Return the image of the next n columns of the strip.
+        """
+        a, b = self.pos, self.pos + n
+
+        while self.end < b:
+            self.next_piece()
+
+        mask = np.zeros((self.display.size.y, n), dtype=np.uint8)
+
+        for piece in self.pieces:
+            piece.draw(mask, a, self.pen_y)
+
+        # the pieces that end before b are not drawn any more.
+        while self.pieces and self.pieces[0].right <= b:
+            self.pieces.popleft()
+
+        self.pos = b
+        # the displays turn the drawn text upside down.
+        return self.display.colorize(np.flipud(mask))
+
+    def write(self, n):
+        """Write the next n columns from the seam, wrapping around the texture;
+           returns the image of the columns.
+        """
+        width = self.display.size.x
+        img = self.display.img
+        cols = cols_written = self.draw_columns(n)
+        x = self.head
+
+        while n:
+            w = min(n, width - x)
+            img[:, x:x + w] = cols[:, :w]
+            cols = cols[:, w:]
+            n -= w
+            x = (x + w) % width
+
+        self.head = x
+        self.display.mark_written()
+        return cols_written
+
+    def start(self, offset):
+        """Fill the texture with the first columns of the strip, starting at the seam.
+        """
+        self.head = int(offset * self.display.size.x) % self.display.size.x
+        return self.write(self.display.size.x)
+
+    def advance(self, offset):
+        """Write the columns that have scrolled past the seam since the last call.
+            Args:
+                offset (float): u offset of the texture, from 0 to 1.
+           Returns the image of the written columns, or None if no column has scrolled.
+        """
+        width = self.display.size.x
+
+        if n := (int(offset * width) % width - self.head) % width:
+            return self.write(n)
@@ -0,0 +1,90 @@
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import numpy as np
+
+
+class LRUCache(ABC):
+    """LRU cache bounded by the total bytes of the cached values.
+       Shared by all displays and worker threads.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def calc_nbytes(self, value):
+        """Return the bytes of the arrays of the value.
+        """
+
+    def get(self, key):
+        with self.lock:
+            if (value := self.entries.get(key)) is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if (nbytes := self.calc_nbytes(value)) > self.max_bytes:
+            return
+
+        with self.lock:
+            if (old := self.entries.pop(key, None)) is not None:
+                self.nbytes -= self.calc_nbytes(old)
+
+            self.entries[key] = value
+            self.nbytes += nbytes
+
+            while self.nbytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.nbytes -= self.calc_nbytes(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self.lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self.entries),
+                nbytes=self.nbytes,
+                max_bytes=self.max_bytes
+            )
+
+
+class MessageCache(LRUCache):
+    """LRU cache of the rendered message images, bounded by the total bytes
+       of the cached arrays or encoded images.
+    """
+
+    def __init__(self, max_bytes=128 * 1024 ** 2):
+        super().__init__(max_bytes)
+
+    def calc_nbytes(self, msg_img):
+        return msg_img.img.nbytes
+
+    def put(self, key, msg_img):
+        # Cached arrays are shared by displays, so they must not be changed;
+        # the arrays of encoded images are read-only already.
+        if isinstance(msg_img.img, np.ndarray):
+            msg_img.img.flags.writeable = False
+
+        super().put(key, msg_img)
+
+
+message_cache = MessageCache()
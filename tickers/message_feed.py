@@ -0,0 +1,137 @@
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class MessageFeed:
+    """Read messages, one per line, from local sources on an asyncio loop
+       in a background thread, and post them to tickers; Panda3D's task loop
+       is never blocked, and the tickers take the messages in their next frame.
+        Args:
+            encoding (str): the encoding of the sources.
+    """
+
+    def __init__(self, encoding='utf-8'):
+        self.encoding = encoding
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='ticker_feed', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        """Cancel the sources, wait for them to close their files and sockets,
+           and stop the loop. Does nothing if the feed is not running.
+        """
+        if not self.thread.is_alive():
+            return
+
+        asyncio.run_coroutine_threadsafe(self.cancel_sources(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    async def cancel_sources(self):
+        # the tasks of the clients connected to the sockets are cancelled too.
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # the transports are closed in the next iteration of the loop.
+        await asyncio.sleep(0)
+
+    def submit(self, coro):
+        """Run the source coro on the loop; returns its concurrent.futures.Future.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(self.report)
+        return future
+
+    def report(self, future):
+        """Log the error that stopped a source, like a file that does not exist.
+        """
+        if not future.cancelled() and (exc := future.exception()) is not None:
+            logger.error('A message feed source stopped: %r', exc, exc_info=exc)
+
+    def add_file(self, path, ticker, priority=0, interval=0.2):
+        """Post the lines appended to the file, like tail -f.
+        """
+        return self.submit(self.tail_file(path, ticker, priority, interval))
+
+    def add_pipe(self, path, ticker, priority=0):
+        """Post the lines written to the named pipe.
+        """
+        return self.submit(self.read_pipe(path, ticker, priority))
+
+    def add_unix_socket(self, path, ticker, priority=0):
+        """Post the lines sent by the clients connected to the unix domain socket.
+        """
+        return self.submit(self.serve_unix_socket(path, ticker, priority))
+
+    def post(self, line, ticker, priority):
+        if isinstance(line, bytes):
+            line = line.decode(self.encoding, errors='replace')
+
+        if msg := line.strip():
+            ticker.post_message(msg, priority)
+
+    async def read_lines(self, reader, ticker, priority):
+        while line := await reader.readline():
+            self.post(line, ticker, priority)
+
+    async def tail_file(self, path, ticker, priority, interval):
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            buf = b''
+
+            while True:
+                if not (data := f.read()):
+                    # truncated by the writer; the partial line is not continued.
+                    if os.path.getsize(path) < f.tell():
+                        f.seek(0)
+                        buf = b''
+                    await asyncio.sleep(interval)
+                    continue
+
+                *lines, buf = (buf + data).split(b'\n')
+
+                for line in lines:
+                    self.post(line, ticker, priority)
+
+    async def read_pipe(self, path, ticker, priority):
+        # Opened for writing too, so that reading does not end when a writer closes it.
+        fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+        reader = asyncio.StreamReader()
+        transport, _ = await self.loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, 'rb', 0))
+
+        try:
+            await self.read_lines(reader, ticker, priority)
+        finally:
+            transport.close()
+
+    async def serve_unix_socket(self, path, ticker, priority):
+        async def handle(reader, writer):
+            try:
+                await self.read_lines(reader, ticker, priority)
+            except asyncio.CancelledError:
+                # asyncio 3.11 logs the cancelled client tasks as errors if raised.
+                pass
+            finally:
+                writer.close()
+
+        server = await asyncio.start_unix_server(handle, path)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            # closing the server leaves the socket file.
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import deque
+from enum import Enum, auto
+from typing import NamedTuple
+
+from .profiling import summarize
+
+
+class QueuePolicy(Enum):
+
+    DROP_OLDEST = auto()    # keep the newest messages in order.
+    LATEST = auto()         # keep only the newest message.
+    PRIORITY = auto()       # keep the messages of the highest priorities.
+
+
+class QueuedMessage(NamedTuple):
+
+    msg: str
+    priority: int
+    time: float     # perf_counter when the message was received.
+    seq: int
+
+
+class MessageQueue:
+    """Bounded queue of the messages waiting for a ticker to finish changing
+       its message. Messages are put from any thread, typically a feed, and
+       taken by the ticker in the main thread.
+        Args:
+            maxlen (int): the number of the messages kept; the others are dropped.
+            policy (QueuePolicy): which message is dropped and which is taken next.
+            window (int): the number of the recent latencies kept.
+    """
+
+    def __init__(self, maxlen=8, policy=QueuePolicy.DROP_OLDEST, window=300):
+        self.maxlen = maxlen
+        self.policy = policy
+        self.items = []
+        self.seq = 0
+        self.received = 0
+        self.drops = 0
+        self.max_depth = 0
+        self.latencies = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def put(self, msg, priority=0):
+        with self.lock:
+            item = QueuedMessage(msg, priority, time.perf_counter(), self.seq)
+            self.seq += 1
+            self.received += 1
+
+            match self.policy:
+
+                case QueuePolicy.LATEST:
+                    self.drops += len(self.items)
+                    self.items = [item]
+
+                case QueuePolicy.DROP_OLDEST:
+                    self.items.append(item)
+
+                    if len(self.items) > self.maxlen:
+                        del self.items[0]
+                        self.drops += 1
+
+                case QueuePolicy.PRIORITY:
+                    self.items.append(item)
+
+                    if len(self.items) > self.maxlen:
+                        # the oldest one of the lowest priority.
+                        self.items.remove(min(self.items, key=lambda x: (x.priority, x.seq)))
+                        self.drops += 1
+
+            self.max_depth = max(self.max_depth, len(self.items))
+
+    def get(self):
+        """Return the next QueuedMessage, or None if the queue is empty.
+        """
+        with self.lock:
+            if not self.items:
+                return None
+
+            if self.policy == QueuePolicy.PRIORITY:
+                item = min(self.items, key=lambda x: (-x.priority, x.seq))
+                self.items.remove(item)
+                return item
+
+            return self.items.pop(0)
+
+    def record_latency(self, item):
+        """Record the seconds from receiving the item until it was fully displayed.
+        """
+        self.latencies.append(time.perf_counter() - item.time)
+
+    def __len__(self):
+        return len(self.items)
+
+    def stats(self):
+        """Return the depth, drops and the latencies in milliseconds.
+        """
+        return dict(
+            depth=len(self.items),
+            max_depth=self.max_depth,
+            received=self.received,
+            drops=self.drops,
+            latency=summarize(self.latencies)
+        )
@@ -2,6 +2,8 @@ from panda3d.core import NodePath, PandaNode
 
 from shapes import Box, Cylinder
 
+from .assets import get_model
+
 
 class BoxModel(NodePath):
 
@@ -35,6 +37,6 @@ class LampShade(NodePath):
 
     def __init__(self, name, scale=0.3):
         super().__init__(PandaNode(name))
-        model = base.loader.load_model('models/stagespotlight/stagespotlight')
-        model.reparent_to(self)
+        # the model is loaded once and instanced by all lamp shades.
+        get_model('models/stagespotlight/stagespotlight').instance_to(self)
         self.set_scale(scale)
\ No newline at end of file
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+from . import transitions
+from .base_ticker import Size
+from .row_rle import RowRLEImage
+from .transitions import get_schedule, put_schedule
+
+
+# Increase it when the images or the schedules are made differently,
+# so that the entries of the old versions are not used.
+VERSION = 2
+
+# the arrays of the encoded images.
+RLE_ARRAYS = ('starts', 'colors', 'row_ptr')
+
+
+class PrerenderCache:
+    """On-disk cache of the message images rendered in advance by prerender.py.
+       Each entry is a directory of the encoded image, the message rows and the schedules
+       of the effect of the display for the rows, saved as .npy files which are
+       memory-mapped when loaded. Entries are found by the hash of the cache key
+       of the display, which has the render settings, so a change of the settings
+       misses the stale entries. Disabled until open is called.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.writable = False
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+        self.lock = threading.Lock()
+
+    def open(self, path, writable=False):
+        """Args:
+            path (str): the cache directory; the entries are in its version subdirectory.
+            writable (bool): save the images rendered on cache misses.
+           The stats are counted from the last open.
+        """
+        self.root = os.path.join(path, f'v{VERSION}')
+        self.writable = writable
+
+        with self.lock:
+            self.hits = self.misses = self.saves = 0
+
+        if writable:
+            os.makedirs(self.root, exist_ok=True)
+
+    def close(self):
+        self.root = None
+        self.writable = False
+
+    def get_dir(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.root, digest)
+
+    def load(self, key):
+        """Return the fields of the MessageImage of the key with the memory-mapped
+           image, or None. The schedules of the entry are added to the cache of transitions.
+        """
+        if self.root is None:
+            return None
+
+        entry = self.get_dir(key)
+
+        try:
+            with open(os.path.join(entry, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = None
+
+        # the hash of another key is very unlikely, but not impossible.
+        if meta is None or meta['key'] != repr(key):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        if (effect := meta['effect']) is not None:
+            effect = getattr(transitions, effect['name'])(*effect['args'])
+            size, top, btm = Size(*meta['size']), meta['top'], meta['btm']
+
+            for name, reverse in [('delete', False), ('display', True)]:
+                schedule = transitions.make_schedule(
+                    meta['kind'],
+                    np.load(os.path.join(entry, f'{name}_order.npy'), mmap_mode='r'),
+                    np.load(os.path.join(entry, f'{name}_offsets.npy'), mmap_mode='r')
+                )
+                put_schedule(effect, size, top, btm, schedule, reverse)
+
+        img = RowRLEImage(
+            meta['shape'],
+            *(np.load(os.path.join(entry, f'{name}.npy'), mmap_mode='r') for name in RLE_ARRAYS)
+        )
+
+        with self.lock:
+            self.hits += 1
+
+        return img, meta['top'], meta['btm'], meta['msg']
+
+    def save(self, key, msg_img, effect, size):
+        """Save msg_img with the schedules of the effect for its rows, if writable.
+           Only the pixel schedules, like the ones of Dissolve, are saved, because
+           the others are made in no time.
+        """
+        if not self.writable:
+            return
+
+        top, btm = int(msg_img.top), int(msg_img.btm)
+        schedule = get_schedule(effect, size, top, btm)
+        meta = dict(
+            key=repr(key),
+            msg=msg_img.msg,
+            top=top,
+            btm=btm,
+            size=list(size),
+            shape=list(msg_img.img.shape),
+            kind=schedule.kind,
+            effect=None
+        )
+
+        tmp = tempfile.mkdtemp(dir=self.root)
+        for name in RLE_ARRAYS:
+            np.save(os.path.join(tmp, f'{name}.npy'), getattr(msg_img.img, name))
+
+        if schedule.kind == 'pixels':
+            meta['effect'] = dict(name=type(effect).__name__, args=list(effect))
+            reversed_schedule = get_schedule(effect, size, top, btm, reverse=True)
+
+            for name, s in [('delete', schedule), ('display', reversed_schedule)]:
+                np.save(os.path.join(tmp, f'{name}_order.npy'), s.order)
+                np.save(os.path.join(tmp, f'{name}_offsets.npy'), s.offsets)
+
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        # replace the entry at once, so that a running ticker never reads half of it.
+        entry = self.get_dir(key)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+
+        with self.lock:
+            self.saves += 1
+
+    def stats(self):
+        with self.lock:
+            return dict(
+                root=self.root,
+                hits=self.hits,
+                misses=self.misses,
+                saves=self.saves
+            )
+
+
+prerender_cache = PrerenderCache()
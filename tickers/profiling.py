@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from panda3d.core import PStatCollector, PStatThread, Thread
+
+
+def summarize(samples):
+    """Return the count, mean, p95 and max of the samples in seconds as milliseconds.
+    """
+    if not (samples := list(samples)):
+        return dict(count=0, mean=0.0, p95=0.0, max=0.0)
+
+    arr = np.array(samples) * 1000
+
+    return dict(
+        count=len(arr),
+        mean=float(arr.mean()),
+        p95=float(np.percentile(arr, 95)),
+        max=float(arr.max())
+    )
+
+
+local = threading.local()
+
+
+def get_pstat_thread():
+    """Return the PStats thread of the current thread, which the collectors
+       count the time against; without it, they count the main thread's.
+       The Python threads, like the ones that render messages, share the
+       external thread of Panda3D; Thread.bind_thread would give each its own,
+       but Panda3D 1.10 cannot unbind them, and crashes when they exit.
+    """
+    if (pstat_thread := getattr(local, 'pstat_thread', None)) is None:
+        pstat_thread = local.pstat_thread = PStatThread(Thread.get_current_thread())
+
+    return pstat_thread
+
+
+class Timer:
+    """Time a section with a PStats collector, and keep the recent
+       samples so that they can be queried without PStats.
+    """
+
+    def __init__(self, name, window=300):
+        self.collector = PStatCollector(name)
+        self.samples = deque(maxlen=window)
+        self.local = threading.local()
+
+    def __enter__(self):
+        self.local.thread = get_pstat_thread()
+        self.collector.start(self.local.thread)
+        self.local.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.samples.append(time.perf_counter() - self.local.start)
+        self.collector.stop(self.local.thread)
+
+    def stats(self):
+        return summarize(self.samples)
+
+
+class Profiler:
+    """Timers of the sections of a ticker, named 'Tickers:<ticker name>:<section>' in PStats.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.timers = {}
+        self.lock = threading.Lock()
+
+    def timer(self, section):
+        if (timer := self.timers.get(section)) is None:
+            with self.lock:
+                if (timer := self.timers.get(section)) is None:
+                    timer = self.timers[section] = Timer(f'Tickers:{self.name}:{section}')
+
+        return timer
+
+    def stats(self):
+        return {section: timer.stats() for section, timer in list(self.timers.items())}
+
+
+profilers = {}
+
+
+def get_profiler(name):
+    """Return the profiler shared by the name, which the displays use until
+       they are given the profiler of their ticker.
+    """
+    if (profiler := profilers.get(name)) is None:
+        profiler = profilers[name] = Profiler(name)
+
+    return profiler
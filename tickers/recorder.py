@@ -0,0 +1,229 @@
+"""Record the texture changes of the displays, and replay them without a window.
+
+A recording is a gzipped file of JSON lines. Each line is an event of a display:
+the message changes, the effects, every step of the transitions and the marquee
+columns, with the seconds since the recording started. The steps have the rows
+they changed and the CRC32 of the written pixels instead of the pixels, so that
+a replay on another display class can be checked to write the same bytes.
+"""
+import gzip
+import json
+import time
+import zlib
+
+import numpy as np
+from panda3d.core import NodePath
+
+from . import ticker_displays
+from . import transitions
+from .base_ticker import Size
+from .profiling import summarize
+
+
+VERSION = 1
+
+
+def checksum(arr):
+    return zlib.crc32(np.ascontiguousarray(arr))
+
+
+def to_spans(rows, height):
+    """Return rows, a slice or row indices, as [start, stop) spans.
+    """
+    if isinstance(rows, slice):
+        start, stop, _ = rows.indices(height)
+        return [[start, stop]] if start < stop else []
+
+    spans = []
+
+    for r in sorted(set(int(r) for r in rows)):
+        if spans and spans[-1][1] == r:
+            spans[-1][1] = r + 1
+        else:
+            spans.append([r, r + 1])
+
+    return spans
+
+
+class Recorder:
+    """Log the texture changes of the attached displays into a file.
+       The checksums of the whole image at the end of each phase cost a few
+       milliseconds, so attach the displays only while recording.
+        Args:
+            path (str): the file to write.
+    """
+
+    def __init__(self, path):
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+        self.start = time.perf_counter()
+        self.keys = {}
+        self.events = 0
+        self.write(dict(op='header', version=VERSION, time=time.time()))
+
+    def write(self, event):
+        self.file.write(json.dumps(event, separators=(',', ':')) + '\n')
+
+    def attach(self, key, display):
+        """Start logging the display under the key. The display must not be
+           changing its message, because only its current message is logged.
+        """
+        self.keys[display] = key
+        display.recorder = self
+
+        self.log_write(
+            display, 'init', None, display.img,
+            cls=type(display).__name__,
+            size=list(display.size),
+            options=display.options,
+            msg=display.msg
+        )
+        self.log_effect(display)
+
+    def detach(self, display):
+        display.recorder = None
+
+    def log(self, display, op, **fields):
+        self.events += 1
+        self.write(dict(
+            t=round(time.perf_counter() - self.start, 6), key=self.keys[display], op=op, **fields))
+
+    def log_write(self, display, op, rows, written, **fields):
+        """Log that written, the pixels in the order of writing, changed the rows;
+           rows is None if the rows are not logged.
+        """
+        if rows is not None:
+            fields['rows'] = to_spans(rows, display.size.y)
+
+        self.log(display, op, crc=checksum(written), **fields)
+
+    def log_effect(self, display):
+        effect = display.effect
+        self.log(display, 'effect', effect=type(effect).__name__, args=list(effect))
+
+    def wrap_feed(self, display, feed, marquee):
+        """Log the texts when the marquee takes them from the feed.
+        """
+        for text in feed:
+            self.log(display, 'feed', text=text, marquee=marquee)
+            yield text
+
+    def close(self):
+        if not self.file.closed:
+            for display in list(self.keys):
+                self.detach(display)
+
+            self.file.close()
+
+
+class Replayer:
+    """Reproduce a recording on new displays. Panda3D must be configured
+       with 'window-type none' or have a window before the displays are created.
+        Args:
+            path (str): a file written by Recorder.
+            classes (dict): display classes by the recorded class names, to replay
+                            the recording on other implementations of the displays.
+    """
+
+    def __init__(self, path, classes=None):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            header, *self.events = [json.loads(line) for line in f]
+
+        if header.get('version') != VERSION:
+            raise ValueError(f'{path} is not a recording of version {VERSION}.')
+
+        self.classes = classes or {}
+        # the texts that each marquee of each display took from its feed.
+        self.feeds = {}
+
+        for event in self.events:
+            if event['op'] == 'feed':
+                self.feeds.setdefault((event['key'], event['marquee']), []).append(event['text'])
+
+    def get_class(self, name):
+        return self.classes.get(name) or getattr(ticker_displays, name)
+
+    def apply(self, displays, event):
+        """Do the event on the display; returns the written pixels if the event has the checksum.
+        """
+        key = event['key']
+        display = displays.get(key)
+
+        match event['op']:
+
+            case 'init':
+                cls = self.get_class(event['cls'])
+                displays[key] = display = cls(
+                    NodePath(key), Size(*event['size']), event['msg'], **event['options'])
+                return display.img
+
+            case 'effect':
+                display.set_effect(getattr(transitions, event['effect'])(*event['args']))
+
+            case 'delete':
+                display.prepare_for_deletion()
+
+            case 'display':
+                display.prepare_for_display(display.render(event['msg']))
+
+            case 'keep':
+                display.keep_rows(display.render(event['msg']))
+
+            case 'step':
+                step = event['step']
+
+                if event['phase'] == 'delete':
+                    display.delete_msg(step)
+                else:
+                    display.display_msg(step)
+
+                if display.transition is None:
+                    return display.img
+
+                return display.transition.get_written(step)
+
+            case 'marquee_start':
+                display.msg_offset = event['offset']
+                display.start_marquee(self.feeds.get((key, event['marquee']), []))
+                return display.img
+
+            case 'marquee':
+                display.msg_offset = event['offset']
+                return display.advance_marquee()
+
+            case 'marquee_stop':
+                display.stop_marquee()
+
+    def run(self, verify=True, realtime=False):
+        """Replay all events and return the report of the mismatches and of
+           the milliseconds that each kind of event took on each display.
+            Args:
+                verify (bool): compare the checksums of the written pixels.
+                realtime (bool): wait until the recorded time of each event,
+                                 to reproduce the timing of the session.
+        """
+        displays = {}
+        samples = {}
+        mismatches = []
+        start = time.perf_counter()
+
+        for i, event in enumerate(self.events):
+            if realtime and (wait := event['t'] - (time.perf_counter() - start)) > 0:
+                time.sleep(wait)
+
+            t = time.perf_counter()
+            written = self.apply(displays, event)
+            samples.setdefault(event['key'], {}).setdefault(event['op'], []).append(
+                time.perf_counter() - t)
+
+            if verify and 'crc' in event and (written is None or checksum(written) != event['crc']):
+                mismatches.append(
+                    dict(index=i, key=event['key'], op=event['op'], step=event.get('step')))
+
+        return dict(
+            events=len(self.events),
+            seconds=time.perf_counter() - start,
+            mismatches=len(mismatches),
+            first_mismatches=mismatches[:20],
+            displays={key: type(display).__name__ for key, display in displays.items()},
+            times={key: {op: summarize(s) for op, s in ops.items()} for key, ops in samples.items()}
+        )
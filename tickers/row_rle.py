@@ -0,0 +1,105 @@
+import numpy as np
+
+
+class RowRLEImage:
+    """A (y, x, z) image stored as the runs of the same pixels in each row.
+       The message images are mostly rows of the background, which become
+       a run each, so they take a fraction of the bytes of the image.
+       Rows and pixels are decoded on demand, so a transition only decodes
+       the rows or the pixels of its step.
+        Args:
+            shape (tuple): (y, x, z) of the image.
+            starts (numpy.ndarray): flat pixel index of the first pixel of each run,
+                                    followed by the number of the pixels.
+            colors (numpy.ndarray): (runs, z) pixel of each run.
+            row_ptr (numpy.ndarray): the runs of row y are row_ptr[y] to row_ptr[y + 1].
+    """
+
+    ndim = 3
+
+    def __init__(self, shape, starts, colors, row_ptr):
+        self.shape = tuple(shape)
+        self.starts = starts
+        self.colors = colors
+        self.row_ptr = row_ptr
+
+        # shared by displays through the caches.
+        for arr in (starts, colors, row_ptr):
+            arr.flags.writeable = False
+
+        # a pixel as a single item, which np.repeat and indexing copy much faster.
+        self.pixels = colors.view(f'V{self.shape[2]}').ravel()
+
+    @classmethod
+    def encode(cls, img):
+        h, w, z = img.shape
+        changes = img[:, 1:] != img[:, :-1]
+        heads = np.ones((h, w), dtype=bool)
+        # or-ing the channels is several times faster than np.any(axis=2).
+        heads[:, 1:] = changes[..., 0]
+
+        for c in range(1, z):
+            heads[:, 1:] |= changes[..., c]
+
+        starts = np.flatnonzero(heads).astype(np.int32)
+        colors = img.reshape(-1, z)[starts]
+        starts = np.append(starts, h * w).astype(np.int32)
+        row_ptr = np.searchsorted(starts, np.arange(h + 1) * w).astype(np.int64)
+
+        return cls(img.shape, starts, colors, row_ptr)
+
+    @property
+    def nbytes(self):
+        return self.starts.nbytes + self.colors.nbytes + self.row_ptr.nbytes
+
+    def decode_span(self, start, stop):
+        """Return the rows start to stop - 1 as a (stop - start, x, z) array.
+        """
+        h, w, z = self.shape
+        a, b = self.row_ptr[start], self.row_ptr[stop]
+        # runs never cross rows, so the runs of the rows are decoded at once.
+        lengths = self.starts[a + 1:b + 1] - self.starts[a:b]
+        pixels = np.repeat(self.pixels[a:b], lengths)
+
+        return pixels.view(np.uint8).reshape(stop - start, w, z)
+
+    def decode(self):
+        return self.decode_span(0, self.shape[0])
+
+    def get_pixels(self, idx):
+        """Return the (len(idx), z) pixels of the flat pixel indices,
+           which are found much faster if sorted.
+        """
+        runs = np.searchsorted(self.starts, idx, side='right') - 1
+        return self.pixels[runs].view(np.uint8).reshape(-1, self.shape[2])
+
+    def __getitem__(self, key):
+        """Decode rows, like an image indexed by rows, or by rows and columns.
+        """
+        if isinstance(key, tuple):
+            # rows are a slice, or broadcast with cols like the arrays of np.ix_.
+            rows, cols = key
+
+            if isinstance(rows, slice):
+                rows = np.arange(*rows.indices(self.shape[0]))[:, None]
+
+            idx = np.asarray(rows) * self.shape[1] + np.asarray(cols)
+            return self.get_pixels(idx.ravel()).reshape(*idx.shape, self.shape[2])
+
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.shape[0])
+
+            if step == 1:
+                return self.decode_span(start, max(start, stop))
+
+            key = np.arange(start, stop, step)
+
+        # negative rows count from the end, and the rows out of range raise IndexError.
+        ys = range(self.shape[0])
+
+        if np.ndim(key) == 0:
+            y = ys[int(key)]
+            return self.decode_span(y, y + 1)[0]
+
+        rows = [self.decode_span(ys[y], ys[y] + 1) for y in map(int, key)]
+        return np.concatenate(rows) if rows else np.empty((0, *self.shape[1:]), dtype=np.uint8)
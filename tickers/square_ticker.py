@@ -2,7 +2,8 @@ from panda3d.core import NodePath
 from panda3d.core import Point3, Vec3, LColor, CardMaker
 # from direct.interval.LerpInterval import LerpTexOffsetInterval
 
-from .base_ticker import Process, Size, BaseTicker
+from .assets import get_texture
+from .base_ticker import Size, BaseTicker
 from .ticker_displays import SquareDisplay
 from .models import BoxModel, LampShade
 from lights import BasicSpotlight
@@ -11,17 +12,20 @@ from lights import BasicSpotlight
 
 class SquareTicker(BaseTicker):
 
-    def __init__(self, msg):
-        super().__init__('square_ticker')
-        self.create_ticker(msg)
+    # the texture size of the displays, which prerender.py also uses.
+    display_size = Size(256 * 12, 256 * 2, 3)
 
-    def create_ticker(self, msg):
+    def __init__(self, msg, compact=False, shared=False, double_buffered=False):
+        super().__init__('square_ticker', duration=0.8)
+        self.create_ticker(msg, compact, shared, double_buffered)
+
+    def create_ticker(self, msg, compact=False, shared=False, double_buffered=False):
         # make building
         self.building = NodePath('building')
         self.building.reparent_to(self.root)
 
         model = BoxModel('building', width=10, depth=10, height=15)
-        model.set_texture(base.loader.load_texture('textures/tile_05.jpg'))
+        model.set_texture(get_texture('textures/tile_05.jpg'))
         model.reparent_to(self.building)
 
         # make billboards
@@ -39,7 +43,7 @@ class SquareTicker(BaseTicker):
             card.set_frame(-4, 4, -2, 2)
             board = billboard.attach_new_node(card.generate())
             board.set_pos_hpr(pos, hpr)
-            board.set_texture(base.loader.load_texture('textures/panda3d_logo.png'))
+            board.set_texture(get_texture('textures/panda3d_logo.png'))
 
         # make lampshades an lights
         # If the spot_light is parented to the lamp_shape, it's put in world coords position.
@@ -72,46 +76,33 @@ class SquareTicker(BaseTicker):
         ticker.set_z(6)
         ticker.reparent_to(self.building)
 
-        size = Size(256 * 12, 256 * 2, 3)
-        self.ticker = SquareDisplay(model, size, msg)
+        size = self.display_size
+        self.ticker = SquareDisplay(
+            model, size, msg, compact=compact, shared=shared, double_buffered=double_buffered)
+        self.ticker.profiler = self.profiler
         # LerpTexOffsetInterval(model, 5, (1, 0), (0, 0)).loop()
 
-    def change_message(self, msg):
-        if not self.process:
-            self.process = Process.DELETE
-            self.next_msg = msg
+    def count_steps(self):
+        return self.ticker.count_steps()
 
-    def delete_old_msg(self):
-        if self.ticker.delete_msg(self.counter):
-            self.counter = 0
-            return True
+    def delete_old_msg(self, step):
+        return self.ticker.delete_msg(step)
 
-        self.counter += 1
+    def render_new_msg(self, msg):
+        return [self.ticker.render(msg)]
 
     def prepare_new_msg(self):
-        self.ticker.prepare_for_display(self.next_msg)
+        self.ticker.prepare_for_display(*self.get_rendered())
         self.next_msg = None
 
-    def display_new_msg(self):
-        if self.ticker.display_msg(self.counter):
-            self.counter = 0
-            return True
-
-        self.counter += 1
+    def display_new_msg(self, step):
+        return self.ticker.display_msg(step)
 
-    def update(self, dt):
+    def move_letters(self, dt):
         self.ticker.move_letters(dt)
 
-        match self.process:
-
-            case Process.DELETE:
-                if self.delete_old_msg():
-                    self.process = Process.PREPARE
-
-            case Process.PREPARE:
-                self.prepare_new_msg()
-                self.process = Process.DISPLAY
+    def update_image(self):
+        return int(self.ticker.update_image())
 
-            case Process.DISPLAY:
-                if self.display_new_msg():
-                    self.process = None
\ No newline at end of file
+    def get_displays(self):
+        return [self.ticker]
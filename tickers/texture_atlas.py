@@ -0,0 +1,90 @@
+import numpy as np
+
+from panda3d.core import Texture
+
+
+class TexturePage:
+    """A texture that stacks the images of the displays of the same size
+       vertically; each display shows its own slot by the v scale and offset
+       of the texture stage, and all changed slots are uploaded at once.
+    """
+
+    def __init__(self, size, slots):
+        self.size = size
+        self.slots = slots
+        self.used = 0
+        self.dirty = False
+
+        self.tex = Texture('image_page')
+        self.tex.setup_2d_texture(
+            size.x,
+            size.y * slots,
+            Texture.T_unsigned_byte,
+            Texture.F_luminance if size.z == 1 else Texture.F_rgb
+        )
+        self.tex.set_ram_image(np.zeros((size.y * slots, size.x, size.z), dtype=np.uint8))
+        self.mem_view = memoryview(self.tex.modify_ram_image())
+        self.img = np.frombuffer(self.mem_view, dtype=np.uint8).reshape(
+            (size.y * slots, size.x, size.z))
+
+    def is_full(self):
+        return self.used == self.slots
+
+    def allocate(self):
+        """Return the index of a new slot.
+        """
+        slot = self.used
+        self.used += 1
+        return slot
+
+    def get_image(self, slot):
+        """Return the zero-copy (y, x, z) view of the slot.
+        """
+        return self.img[slot * self.size.y:(slot + 1) * self.size.y]
+
+    def get_uv(self, slot):
+        """Return the v scale and offset that map a model to the slot.
+        """
+        return 1 / self.slots, slot / self.slots
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def upload(self):
+        if not self.dirty:
+            return False
+
+        self.tex.modify_ram_image()
+        self.dirty = False
+        return True
+
+
+class TexturePool:
+    """Pages of textures shared by the displays created with shared=True,
+       grouped by the display size.
+        Args:
+            slots (int): the number of the displays in a page.
+    """
+
+    def __init__(self, slots=4):
+        self.slots = slots
+        self.pages = {}
+
+    def allocate(self, size):
+        """Return a page with a free slot for the size and the index of the slot.
+        """
+        pages = self.pages.setdefault(size, [])
+
+        if not pages or pages[-1].is_full():
+            pages.append(TexturePage(size, self.slots))
+
+        page = pages[-1]
+        return page, page.allocate()
+
+    def flush(self):
+        """Upload the changed pages; returns the number of the uploaded textures.
+        """
+        return sum(page.upload() for pages in self.pages.values() for page in pages)
+
+
+texture_pool = TexturePool()
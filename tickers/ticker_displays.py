@@ -1,50 +1,678 @@
-import struct
+from typing import NamedTuple
 
-import cv2
 import numpy as np
-from PIL import Image, ImageFont, ImageDraw, ImageOps
 
 from panda3d.core import Texture, TextureStage
 
+from .assets import get_font
+from .glyph_atlas import CV2GlyphAtlas, PILGlyphAtlas, get_atlas, make_color_table
+from .lazy_import import lazy_import
+from .marquee import Marquee
+from .message_cache import message_cache
+from .prerender_cache import prerender_cache
+from .profiling import get_profiler
+from .row_rle import RowRLEImage
+from .texture_atlas import texture_pool
+from .transitions import Dissolve, RowSweep, RowWipe, Transition, find_changed_rows, get_schedule
+from .visibility import get_screen_size
 
-class Ticker:
 
-    def __init__(self, model, size, msg, **kwargs):
+# only the backends of the displays in use are imported.
+cv2 = lazy_import('cv2')
+
+
+def make_buffer_stages():
+    """Return the texture stages of the double buffered mode: the front image
+       is saved, the back image is interpolated with it by the mask, and
+       the result is lit at last.
+    """
+    front = TextureStage('front')
+    front.set_sort(0)
+    front.set_mode(TextureStage.M_replace)
+    front.set_saved_result(True)
+
+    mask = TextureStage('mask')
+    mask.set_sort(1)
+    mask.set_mode(TextureStage.M_replace)
+
+    back = TextureStage('back')
+    back.set_sort(2)
+    back.set_combine_rgb(
+        TextureStage.CM_interpolate,
+        TextureStage.CS_texture, TextureStage.CO_src_color,
+        TextureStage.CS_last_saved_result, TextureStage.CO_src_color,
+        TextureStage.CS_previous, TextureStage.CO_src_color
+    )
+
+    # needs a texture to be enabled; the mask is bound but not used.
+    light = TextureStage('light')
+    light.set_sort(3)
+    light.set_combine_rgb(
+        TextureStage.CM_modulate,
+        TextureStage.CS_previous, TextureStage.CO_src_color,
+        TextureStage.CS_primary_color, TextureStage.CO_src_color
+    )
+
+    return front, mask, back, light
+
+
+BUFFER_STAGES = make_buffer_stages()
+
+
+def make_ram_texture(name, img):
+    """Return a texture of img and the zero-copy (y, x, z) view of its ram image.
+    """
+    tex = Texture(name)
+    h, w, z = img.shape
+
+    tex.setup_2d_texture(
+        w, h, Texture.T_unsigned_byte, Texture.F_luminance if z == 1 else Texture.F_rgb)
+    tex.set_ram_image(img)
+    # the texture's own ram image; it is never replaced by set_ram_image,
+    # so writing to the view changes the texture in place.
+    mem_view = memoryview(tex.modify_ram_image())
+    return tex, np.frombuffer(mem_view, dtype=np.uint8).reshape(img.shape)
+
+
+class MessageImage(NamedTuple):
+
+    img: RowRLEImage      # or numpy.ndarray
+    top: int = None
+    btm: int = None
+    msg: str = None
+
+
+class RowDiff(NamedTuple):
+    """The rows of a new message compared with the old message being deleted.
+    """
+
+    same: np.ndarray      # the rows of the old message that the new one shares.
+    ink: np.ndarray       # the rows of the new message that differ from the background.
+    changed: np.ndarray   # the rows to change into the new message if none are kept.
+
+
+class Ticker:
+    """Show the messages on the texture of the model.
+        Args:
+            model (NodePath): the model that has the texture.
+            size (Size): the size of the texture.
+            msg (str): the first message.
+            compact (bool): keep only the coverage of the text in a one-channel texture.
+            shared (bool): use a slot of a texture page shared by the displays of the same size.
+            double_buffered (bool): upload only a one-byte mask in the transitions. The front
+                and the back RAM images and the mask are kept for the life of the display,
+                as the views that the transitions write in place, so it takes (2z + 1) / z
+                times the host memory of the default mode, 7/3 for RGB, and three textures.
+    """
+
+    def __init__(self, model, size, msg, compact=False, shared=False, double_buffered=False, **kwargs):
         self.model = model
-        self.size = size
+        # In the compact mode, the texture has only the coverage of the text,
+        # and the text color is applied by the color scale of the model.
+        self.compact = compact
+        self.size = size._replace(z=1) if compact else size
+        # If shared, the image is a slot of a texture page shared by the
+        # displays of the same size, which is uploaded by texture_pool.flush.
+        self.shared = shared
+        # If double buffered, a new image is written to the back texture at once,
+        # and the transition only changes a one-byte mask between the front and
+        # the back textures, which are swapped at the end.
+        self.double_buffered = double_buffered
+        self.v_offset = 0
+
+        if shared and double_buffered:
+            raise ValueError('The double buffered mode cannot share textures.')
+        # replaced with the profiler of the ticker that has this display.
+        self.profiler = get_profiler(self.__class__.__name__)
+        # the arguments to create the same display again, which are used by recorder.
+        self.options = dict(kwargs, shared=shared, double_buffered=double_buffered)
+        if compact:
+            self.options['compact'] = compact
+        # set by Recorder.attach to log the changes of the texture.
+        self.recorder = None
+        self.marquees = 0
 
         self.display_settings(**kwargs)
         self.initialize(msg)
 
     def initialize(self, msg):
-        self.tex = Texture('image')
+        self.msg = msg
+        img = self.create_image(msg)
+        self.msg_top, self.msg_btm = self.find_msg_rows(msg, img)
+        # the rows that the next deletion changes.
+        self.ink = find_changed_rows(
+            img, self.get_pixel(self.bg_color), slice(max(self.msg_btm, 0), self.msg_top + 1))
+
+        self.stages = [TextureStage.get_default()]
+
+        if self.shared:
+            self.initialize_shared(img)
+        else:
+            self.initialize_texture(img)
+
+        if self.double_buffered:
+            self.initialize_buffers()
+        else:
+            self.model.set_texture(self.tex)
+
+        if self.compact:
+            if any(self.bg_color):
+                raise ValueError('The compact mode needs the black background.')
+
+            # ram images are in BGR order.
+            b, g, r = (c / 255 for c in self.text_color)
+            self.model.set_color_scale(r, g, b, 1)
+
+        self.dirty_rows = set()
+        self.front_dirty = False
+        self.transition = None
+        self.phase = None
+        self.old_range = None
+        self.old_rows = None
+        self.old_img = None
+        self.kept = None
+        self.diff = None
+        self.marquee = None
+
+        self.visible = True
+        self.lod = 0
+        self.lod_tex = None
+        self.lod_img = None
+
+    def initialize_texture(self, img):
+        self.tex, self.img = make_ram_texture('image', img)
+
+    def initialize_buffers(self):
+        self.back_tex, self.back_img = make_ram_texture('back_image', self.img)
+        self.mask_tex, self.mask_img = make_ram_texture(
+            'mask', np.zeros((self.size.y, self.size.x, 1), dtype=np.uint8))
+        self.back_dirty = False
+        # the rows where the back image may differ from the front one.
+        self.stale_rows = slice(0, 0)
+
+        front_ts, mask_ts, back_ts, light_ts = self.stages = BUFFER_STAGES
+        self.model.set_texture_off(TextureStage.get_default())
+        self.model.set_texture(front_ts, self.tex)
+        self.model.set_texture(mask_ts, self.mask_tex)
+        self.model.set_texture(back_ts, self.back_tex)
+        self.model.set_texture(light_ts, self.mask_tex)
+
+    def swap_buffers(self):
+        """Show the back image, which has been revealed by the mask, as the front.
+        """
+        self.tex, self.back_tex = self.back_tex, self.tex
+        self.img, self.back_img = self.back_img, self.img
+
+        front_ts, _, back_ts, _ = self.stages
+        self.model.set_texture(front_ts, self.tex)
+        self.model.set_texture(back_ts, self.back_tex)
+
+        self.mask_img[:] = 0
+        self.mark_dirty(slice(None))
+
+    def set_tex_offset(self, uv):
+        for ts in self.stages:
+            self.model.set_tex_offset(ts, uv)
+
+    def initialize_shared(self, img):
+        self.page, slot = texture_pool.allocate(self.size)
+        self.tex = self.page.tex
+        self.img = self.page.get_image(slot)
+        self.img[:] = img
+        self.page.mark_dirty()
+
+        v_scale, self.v_offset = self.page.get_uv(slot)
+        ts = TextureStage.get_default()
+        self.model.set_tex_scale(ts, 1, v_scale)
+        self.model.set_tex_offset(ts, 0, self.v_offset)
+
+    def mark_dirty(self, *rows):
+        """Record the rows changed since the last upload.
+            Args:
+                rows (int or slice): row indices or slices of rows.
+        """
+        for r in rows:
+            if isinstance(r, slice):
+                self.dirty_rows.update(range(*r.indices(self.size.y)))
+            else:
+                self.dirty_rows.add(int(r))
+
+    def mark_written(self):
+        """Record that the whole image has been written, like by a marquee.
+        """
+        if self.double_buffered:
+            # the mask does not change, but the front image has to be uploaded
+            # and is copied to the back one by the next transition.
+            self.front_dirty = True
+            self.stale_rows = slice(None)
+        else:
+            self.mark_dirty(slice(None))
+
+    def start_marquee(self, feed):
+        """Scroll the texts of feed through the texture, which is used as a ring buffer.
+           Only the displays that scroll their texture by msg_offset support it.
+        """
+        if not hasattr(self, 'msg_offset'):
+            raise NotImplementedError(f'{self.__class__.__name__} does not scroll its texture.')
 
-        self.tex.setup_2d_texture(
-            self.size.x,
-            self.size.y,
-            Texture.T_unsigned_byte,
-            Texture.F_rgb
-        )
+        self.marquees += 1
 
-        img = self.create_image(msg)
-        self.tex.set_ram_image(img)
-        self.model.set_texture(self.tex)
-        self.mem_view = memoryview(self.tex.modify_ram_image())
+        if self.recorder:
+            feed = self.recorder.wrap_feed(self, feed, self.marquees)
+
+        self.marquee = Marquee(self, feed)
+        self.marquee.start(self.msg_offset)
+        # the texts can cover any rows, so all rows are deleted by the next message.
+        self.msg_top, self.msg_btm = self.size.y - 1, 0
+        self.ink = None
+
+        if self.recorder:
+            self.recorder.log_write(
+                self, 'marquee_start', None, self.img, offset=self.msg_offset, marquee=self.marquees)
+
+    def advance_marquee(self):
+        """Write the columns of the marquee that have scrolled past the seam;
+           returns their image, or None.
+        """
+        if self.marquee and (cols := self.marquee.advance(self.msg_offset)) is not None:
+            if self.recorder:
+                self.recorder.log_write(self, 'marquee', None, cols, offset=self.msg_offset)
+
+            return cols
+
+    def stop_marquee(self):
+        if self.marquee and self.recorder:
+            self.recorder.log(self, 'marquee_stop')
+
+        self.marquee = None
+
+    def set_effect(self, effect):
+        """Change the effect of the next transitions.
+            Args:
+                effect: one of the effects in transitions, like RowWipe().
+        """
+        self.effect = effect
+
+        if self.recorder:
+            self.recorder.log_effect(self)
+
+    def prepare_for_deletion(self):
+        """Start deleting the current message.
+        """
+        schedule = get_schedule(self.effect, self.size, self.msg_top, self.msg_btm)
+        rows = slice(max(self.msg_btm, 0), self.msg_top + 1)
+        # the old rows are kept to be compared with the next message by compare_rows
+        # while they are deleted; the front image of the double buffered mode
+        # is not changed until the swap.
+        self.old_range = rows
+        self.old_img = self.img
+        self.old_rows = self.img[rows] if self.double_buffered else self.img[rows].copy()
+        self.kept = None
+        self.diff = None
+
+        if (changed := self.ink) is None:
+            changed = np.zeros(self.size.y, dtype=bool)
+            changed[rows] = True
+
+        self.transition = self.start_transition(schedule, self.get_pixel(self.bg_color), changed)
+        self.phase = 'delete'
+
+        if self.recorder:
+            self.recorder.log(self, 'delete')
+
+    def prepare_for_display(self, msg_img):
+        """msg_img: MessageImage returned from render.
+        """
+        # compared by the worker that rendered msg_img, unless replayed by recorder.
+        diff = self.diff if self.diff is not None else self.compare_rows(msg_img)
+        self.msg = msg_img.msg
+        self.msg_top, self.msg_btm = msg_img.top, msg_img.btm
+        schedule = get_schedule(self.effect, self.size, self.msg_top, self.msg_btm, reverse=True)
+        self.phase = 'display'
+
+        if self.recorder:
+            self.recorder.log(self, 'display', msg=self.msg)
+
+        changed = diff.changed
+
+        if self.kept is not None:
+            # the kept rows are the same as the new message already.
+            changed = changed & ~self.kept
+
+        if not self.double_buffered:
+            # the back texture of the double buffered mode has the image instead.
+            self.next_img = msg_img.img
+
+        self.transition = self.start_transition(schedule, msg_img.img, changed)
+
+        self.ink = diff.ink
+        self.old_range = self.old_rows = self.old_img = self.kept = self.diff = None
+
+    def compare_rows(self, msg_img):
+        """Return the RowDiff of msg_img, the next message, from the old message
+           being deleted. Called from the worker thread that rendered msg_img,
+           so that no rows are compared in the frames. An encoded image is
+           decoded by spans of rows, which are not kept.
+        """
+        # the schedule of the display transition is made in advance too.
+        get_schedule(self.effect, self.size, msg_img.top, msg_img.btm, reverse=True)
+        img = msg_img.img
+        new = slice(max(msg_img.btm, 0), msg_img.top + 1)
+        old, old_img = self.old_range, self.old_img
+        same = np.zeros(self.size.y, dtype=bool)
+
+        if old is None:
+            # displayed over the current image without deleting a message.
+            old, old_img = slice(0, 0), self.img
+        else:
+            same[old] = ~find_changed_rows(self.old_rows, img, slice(None), offset=old.start)
+
+        ink = find_changed_rows(img, self.get_pixel(self.bg_color), new)
+
+        # the old rows are the background after the deletion, and the others are not changed.
+        changed = ink.copy()
+        changed[:old.start] = False
+        changed[old.stop:] = False
+
+        for rows in [slice(new.start, min(new.stop, old.start)), slice(max(new.start, old.stop), new.stop)]:
+            changed |= find_changed_rows(old_img, img, rows)
+
+        return RowDiff(same, ink, changed)
+
+    def start_transition(self, schedule, target, changed):
+        """Return the transition that changes the message rows into target.
+            Args:
+                changed (numpy.ndarray): boolean mask of the rows that differ from target.
+        """
+        if not self.double_buffered:
+            return Transition(schedule, self.img, target, self.msg_top, self.msg_btm, changed)
+
+        rows = slice(max(self.msg_btm, 0), self.msg_top + 1)
+        # the images are the same except on the rows of the last transition.
+        self.back_img[self.stale_rows] = self.img[self.stale_rows]
+
+        if isinstance(target, tuple):
+            # a row of the pixel is copied many times faster than the pixel is broadcast.
+            self.back_img[rows] = np.full((self.size.x, len(target)), target, dtype=np.uint8)
+        else:
+            self.back_img[rows] = target[rows]
+
+        self.stale_rows = rows
+        self.back_dirty = True
+
+        return Transition(schedule, self.mask_img, (255,), self.msg_top, self.msg_btm, changed)
+
+    def keep_rows(self, msg_img, diff=None):
+        """While the old message is deleted, stop deleting the rows that are the same
+           in msg_img, the next message, and that the deletion has not reached yet,
+           so that they stay through the change and are skipped by the display
+           transition too.
+            Args:
+                diff (RowDiff): msg_img compared by compare_rows, which is called if not given.
+        """
+        self.diff = diff if diff is not None else self.compare_rows(msg_img)
+
+        if self.phase != 'delete' or self.transition is None:
+            return
+
+        if self.recorder:
+            self.recorder.log(self, 'keep', msg=msg_img.msg)
+
+        # the rows that the deletion has reached stay deleted, and are drawn again
+        # by the display transition; the others have not been changed yet.
+        self.kept = self.transition.keep_rows(self.diff.same)
+
+        if self.double_buffered:
+            # the back image is the background on the rows being deleted.
+            self.back_img[self.kept] = self.img[self.kept]
+            self.back_dirty = True
+
+    def count_steps(self):
+        """Return the number of the calls of delete_msg or display_msg
+           for the current transition, including the last one that returns True.
+        """
+        return self.transition.steps + 1
+
+    def run_transition(self, step):
+        if self.transition is None:
+            return True
+
+        if (rows := self.transition.apply(step)) is None:
+            self.transition = None
+
+            if self.double_buffered:
+                self.swap_buffers()
+
+            if self.recorder:
+                # the whole image is checked once at the end of a phase.
+                self.recorder.log_write(self, 'step', None, self.img, phase=self.phase, step=step)
+
+            return True
+
+        if isinstance(rows, slice):
+            self.mark_dirty(rows)
+        else:
+            self.mark_dirty(*rows)
+
+        if self.recorder:
+            self.recorder.log_write(
+                self, 'step', rows, self.transition.get_written(step), phase=self.phase, step=step)
+
+    def delete_msg(self, step):
+        """step: must be 0 or more.
+        """
+        return self.run_transition(step)
+
+    def display_msg(self, step):
+        """step: must be 0 or more.
+        """
+        if self.run_transition(step):
+            self.next_img = None
+            return True
 
     def update_image(self):
-        self.tex.set_ram_image(self.mem_view)
-        self.model.clear_color()
-        self.model.set_texture(self.tex)
+        """Upload the rows changed since the last call; must be called once per frame.
+           Panda3D 1.10 has no API to upload a part of a texture, so the changed
+           spans are coalesced into a single re-upload of the ram image, which is
+           only requested when some rows are dirty.
+        """
+        # the dirty rows of a hidden display are kept until it is visible again.
+        if not (self.dirty_rows or self.front_dirty) or not self.visible:
+            return False
+
+        if self.shared:
+            self.page.mark_dirty()
+            self.dirty_rows.clear()
+            return False
+
+        if self.double_buffered:
+            # a transition changes only the mask, and a marquee the front image.
+            for tex, dirty in [(self.tex, self.front_dirty),
+                               (self.back_tex, self.back_dirty),
+                               (self.mask_tex, self.dirty_rows)]:
+                if dirty:
+                    tex.modify_ram_image()
+
+            self.front_dirty = self.back_dirty = False
+            self.dirty_rows.clear()
+            return True
+
+        if self.lod:
+            f = 2 ** self.lod
+            rows = np.array(sorted({r // f for r in self.dirty_rows}))
+            self.lod_img[rows] = self.img[rows * f, ::f]
+            self.lod_tex.modify_ram_image()
+        else:
+            self.tex.modify_ram_image()
+
+        self.dirty_rows.clear()
+        return True
+
+    def update_view(self, camera, lod_sizes):
+        """Update the visibility and the texture level from the camera;
+           returns True if the display is visible.
+            Args:
+                camera (NodePath): the camera that shows the display.
+                lod_sizes (tuple): screen height fractions under which the texture
+                                   is downsampled by 2, 4, ...
+        """
+        size = get_screen_size(self.model, camera)
+        self.visible = size > 0
+
+        if self.visible:
+            self.set_lod(sum(size < s for s in lod_sizes))
+
+        return self.visible
+
+    def set_lod(self, level):
+        """Show the texture downsampled by 2 ** level. The full resolution image
+           is still written by the transitions, and only the rows of the small
+           texture are refreshed from it, so the switch back is lossless.
+        """
+        # a shared page is shown by other displays anyway.
+        if level == self.lod or self.shared or self.double_buffered:
+            return
+
+        self.lod = level
+
+        if self.lod_tex:
+            self.lod_tex.release_all()
+            self.lod_tex = self.lod_img = None
+
+        if level == 0:
+            self.model.set_texture(self.tex)
+            # the full resolution texture was not uploaded while it was replaced.
+            self.tex.modify_ram_image()
+            return
+
+        f = 2 ** level
+        small = np.ascontiguousarray(self.img[::f, ::f])
+
+        self.lod_tex = Texture('image_lod')
+        self.lod_tex.setup_2d_texture(
+            small.shape[1], small.shape[0], Texture.T_unsigned_byte, self.tex.get_format())
+        self.lod_tex.set_ram_image(small)
+        self.lod_img = np.frombuffer(
+            memoryview(self.lod_tex.modify_ram_image()), dtype=np.uint8).reshape(small.shape)
+
+        self.model.set_texture(self.lod_tex)
+        # free the video memory of the full resolution texture.
+        self.tex.release_all()
+
+    def render(self, msg, **kwargs):
+        """Return the image of msg without changing the display,
+           so that it can be called from a worker thread.
+           The returned arrays are shared through message_cache; do not change them.
+           The images prerendered on disk are memory-mapped instead of rendered.
+        """
+        key = self.cache_key(msg, **kwargs)
+
+        if (msg_img := message_cache.get(key)) is None:
+            if (fields := prerender_cache.load(key)) is not None:
+                msg_img = MessageImage(*fields)
+            else:
+                msg_img = self.rasterize(msg, **kwargs)
+                prerender_cache.save(key, msg_img, self.effect, self.size)
+
+            message_cache.put(key, msg_img)
+
+        return msg_img
+
+    def rasterize(self, msg, **kwargs):
+        """Return the MessageImage of msg; the image is kept encoded while it is cached
+           or pending, and the transitions decode only the rows or pixels of each step.
+        """
+        with self.profiler.timer('create_image'):
+            img = self.create_image(msg, **kwargs)
+
+        with self.profiler.timer('encode_image'):
+            encoded = RowRLEImage.encode(img)
+
+        return MessageImage(encoded, *self.find_msg_rows(msg, img), msg)
+
+    def cache_key(self, msg, **kwargs):
+        return (
+            self.__class__.__name__,
+            msg,
+            self.size,
+            self.render_settings(),
+            tuple(sorted(kwargs.items()))
+        )
+
+    def get_msg_positions(self, width):
+        """Return the x positions to repeat a message of the width across the texture.
+        """
+        msg_cnt = self.size.x // width
+        spaces = self.size.x - msg_cnt * width
+        xs = []
+        x = 0
+
+        for i in range(msg_cnt):
+            xs.append(x)
+            x += width + (spaces + i) // msg_cnt
+
+        return xs
+
+    def get_pixel(self, color):
+        """Return the pixel value of bg_color or text_color in the texture.
+        """
+        if self.compact:
+            return (255,) if color == self.text_color else (0,)
+
+        return color
+
+    def colorize(self, mask):
+        """Convert a coverage mask to the image to be set to the texture.
+        """
+        if self.compact:
+            return np.ascontiguousarray(mask[..., np.newaxis])
+
+        return np.take(self.color_table, mask, axis=0)
+
+    def layout_msg(self, msg):
+        """Return the text drawn for msg, the x positions of its copies
+           and the y position of the pen, or None if unknown.
+        """
+        return None
+
+    def find_msg_rows(self, msg, img):
+        """Return msg_top and msg_btm of the image of msg, computed from
+           the glyph metrics if possible, otherwise by scanning the image.
+        """
+        if (layout := self.layout_msg(msg)) is None:
+            return self.get_min_max_rows(img, self.text_color)
+
+        text, xs, y = layout
+
+        if not xs or (rows := self.atlas.get_ink_rows(text)) is None:
+            return -1, 0
+
+        start = max(y + rows[0], 0)
+        stop = min(y + rows[1], self.size.y)
+
+        if start >= stop:
+            return -1, 0
+
+        # all the displays turn the drawn text upside down.
+        return self.size.y - 1 - start, self.size.y - stop
 
     def get_min_max_rows(self, img, color):
-        idxes = np.where(np.all(img == color, axis=2))[0]
+        """Return the last and first rows that have the color.
+           If no rows have it, (-1, 0) is returned so that no rows are processed.
+        """
+        has_color = np.all(img == self.get_pixel(color), axis=2).any(axis=1)
+
+        if not (idxes := np.flatnonzero(has_color)).size:
+            return -1, 0
+
         return idxes[-1], idxes[0]
 
 
 class SquareDisplay(Ticker):
 
-    def __init__(self, model, size, msg):
-        super().__init__(model, size, msg)
+    def __init__(self, model, size, msg, compact=False, shared=False, double_buffered=False):
+        super().__init__(
+            model, size, msg, compact=compact, shared=shared, double_buffered=double_buffered)
 
     def display_settings(self):
         self.font_face = cv2.FONT_HERSHEY_COMPLEX
@@ -58,88 +686,49 @@ class SquareDisplay(Ticker):
         self.text_color = (0, 215, 255)
         self.msg_offset = 0
         self.next_img = None
-        self.ts = TextureStage.get_default()
+        self.effect = RowWipe()
 
-    def create_image(self, msg):
-        img = np.zeros(self.size.arr, dtype=np.uint8)
+        self.atlas = get_atlas(CV2GlyphAtlas, self.font_face, self.scale, self.thickness)
+        self.color_table = make_color_table(self.bg_color, self.text_color)
 
+    def layout_msg(self, msg):
         msg = msg + '  '
         (width, _), _ = cv2.getTextSize(msg, self.font_face, self.scale, self.thickness)
-        msg_cnt = self.size.x // width
-        spaces = self.size.x - msg_cnt * width
-        x = 0
-
-        for i in range(msg_cnt):
-            cv2.putText(
-                img,
-                msg,
-                (x, 300),
-                self.font_face,
-                self.scale,
-                self.text_color,
-                thickness=self.thickness
-            )
-            x += width + (spaces + i) // msg_cnt
+        return msg, self.get_msg_positions(width), 300
 
-        img = cv2.rotate(img, cv2.ROTATE_180)
-        img = cv2.flip(img, 1)
-        self.msg_top, self.msg_btm = self.get_min_max_rows(img, self.text_color)
-
-        return img
+    def create_image(self, msg):
+        mask = np.zeros(self.size.arr[:2], dtype=np.uint8)
+        self.atlas.draw_tiled_text(mask, *self.layout_msg(msg))
+
+        mask = cv2.rotate(mask, cv2.ROTATE_180)
+        mask = cv2.flip(mask, 1)
+        return self.colorize(mask)
+
+    def render_settings(self):
+        return (
+            self.font_face,
+            self.scale,
+            self.thickness,
+            self.bg_color,
+            self.text_color
+        )
 
     def move_letters(self, dt):
         self.msg_offset += dt * 0.1
         if self.msg_offset > 1:
             self.msg_offset = 0
 
-        uv = (self.msg_offset, 0)
-        self.model.set_tex_offset(self.ts, uv)
-
-    def delete_msg(self, row_cnt):
-        """row_cnt: must be 0 or more.
-        """
-        if (self.msg_top - self.msg_btm) < row_cnt * 2:
-            return True
-
-        process_rs = set(
-            [self.msg_top - row_cnt, self.msg_btm + row_cnt]
-        )
+        uv = (self.msg_offset, self.v_offset)
+        self.set_tex_offset(uv)
 
-        for process_r in process_rs:
-            start = process_r * self.size.row_length
-            end = start + self.size.row_length
-            li = self.bg_color * self.size.x
-            self.mem_view[start:end] = struct.pack('B' * len(li), *li)
-
-        self.update_image()
-
-    def display_msg(self, row_cnt):
-        """row_cnt: must be 0 or more.
-        """
-        if (n := (self.msg_top - self.msg_btm) // 2 - row_cnt) < 0:
-            self.next_img = None
-            return True
-
-        process_rs = set(
-            [self.msg_btm + n, self.msg_top - n]
-        )
-
-        for process_r in process_rs:
-            start = process_r * self.size.row_length
-            end = start + self.size.row_length
-            li = self.next_img[start:end]
-            self.mem_view[start:end] = struct.pack('B' * len(li), *li)
-            self.update_image()
-
-    def prepare_for_display(self, msg):
-        img = self.create_image(msg)
-        self.next_img = np.ravel(img)
+        self.advance_marquee()
 
 
 class CircularDisplay(Ticker):
 
-    def __init__(self, model, size, msg, outer=True):
-        super().__init__(model, size, msg, outer=outer)
+    def __init__(self, model, size, msg, outer=True, shared=False, double_buffered=False):
+        super().__init__(
+            model, size, msg, shared=shared, double_buffered=double_buffered, outer=outer)
 
     def display_settings(self, outer):
         self.font_face = cv2.FONT_HERSHEY_SIMPLEX
@@ -156,164 +745,119 @@ class CircularDisplay(Ticker):
         self.outer = outer
         self.speed = 10 if self.outer else -10
         self.next_img = None
+        self.effect = RowSweep()
 
-    def create_image(self, msg, lines=True):
-        img = np.zeros(self.size.arr, dtype=np.uint8)
-        img[:, :, 0] = self.bg_color[0]
+        self.atlas = get_atlas(CV2GlyphAtlas, self.font_face, self.scale, self.thickness)
+        self.color_table = make_color_table(self.bg_color, self.text_color)
+        self.line_rows, self.line_pixels = self.create_lines()
 
-        msg = msg + ' '
-        (width, _), _ = cv2.getTextSize(msg, self.font_face, self.scale, self.thickness)
-        msg_cnt = self.size.x // width
-        spaces = self.size.x - msg_cnt * width
-        x = 0
+    def create_lines(self):
+        """Draw the lines once, and return the rows they cover and the pixels of the rows.
+           The lines do not overlap the text, so the rows can be copied to every image.
+        """
+        img = np.empty(self.size.arr, dtype=np.uint8)
+        img[:] = self.bg_color
 
-        for i in range(msg_cnt):
-            cv2.putText(
+        for y in [40, 480]:
+            cv2.line(
                 img,
-                msg,
-                (x, 260),
-                self.font_face,
-                self.scale,
-                self.text_color,
-                thickness=self.thickness
+                (0, y),
+                (self.size.x, y),
+                self.line_color,
+                thickness=20,
+                lineType=cv2.LINE_AA
             )
-            x += width + (spaces + i) // msg_cnt
 
-        img = cv2.rotate(img, cv2.ROTATE_180)
+        rows = np.flatnonzero(np.any(img != self.bg_color, axis=(1, 2)))
+        return rows, img[rows]
+
+    def layout_msg(self, msg):
+        msg = msg + ' '
+        (width, _), _ = cv2.getTextSize(msg, self.font_face, self.scale, self.thickness)
+        return msg, self.get_msg_positions(width), 260
+
+    def create_image(self, msg, lines=True):
+        mask = np.zeros(self.size.arr[:2], dtype=np.uint8)
+        self.atlas.draw_tiled_text(mask, *self.layout_msg(msg))
+
+        mask = cv2.rotate(mask, cv2.ROTATE_180)
 
         if self.outer:
-            img = cv2.flip(img, 1)
+            mask = cv2.flip(mask, 1)
+
+        img = self.colorize(mask)
 
         if lines:
-            for y in [40, 480]:
-                cv2.line(
-                    img,
-                    (0, y),
-                    (self.size.x, y),
-                    self.line_color,
-                    thickness=20,
-                    lineType=cv2.LINE_AA
-                )
-
-        self.msg_top, self.msg_btm = self.get_min_max_rows(img, self.text_color)
+            img[self.line_rows] = self.line_pixels
+
         return img
 
     def move_letters(self, dt):
         angle = dt * self.speed
         self.model.set_h(self.model.get_h() - angle)
 
-    def delete_msg(self, row_cnt):
-        if (process_r := self.msg_btm + row_cnt) > self.msg_top or \
-                process_r < self.msg_btm:
-            return True
-
-        start = process_r * self.size.row_length
-        end = start + self.size.row_length
-        # struct is faster than ndarray.
-        li = [255, 0, 0] * self.size.x
-        self.mem_view[start:end] = struct.pack('B' * len(li), *li)
-        self.update_image()
-        # self.mem_view[start:end] = np.array([255, 0, 0] * self.size.x, dtype=np.uint8)
-
-    def display_msg(self, row_cnt):
-        if (process_r := self.msg_top - row_cnt) < self.msg_btm or \
-                process_r > self.msg_top:
-            self.next_img = None
-            return True
-
-        start = process_r * self.size.row_length
-        end = start + self.size.row_length
-        li = self.next_img[start:end]
-        self.mem_view[start:end] = struct.pack('B' * len(li), *li)
-        self.update_image()
+    def render_settings(self):
+        return (
+            self.font_face,
+            self.scale,
+            self.thickness,
+            self.bg_color,
+            self.text_color,
+            self.line_color,
+            self.outer
+        )
 
-    def prepare_for_display(self, msg):
-        img = self.create_image(msg, lines=False)
-        self.next_img = np.ravel(img)
+    def render(self, msg):
+        return super().render(msg, lines=False)
 
 
 class VerticalDisplay(Ticker):
 
-    def __init__(self, model, size, msg):
-        super().__init__(model, size, msg)
+    def __init__(self, model, size, msg, compact=False, shared=False, double_buffered=False):
+        super().__init__(
+            model, size, msg, compact=compact, shared=shared, double_buffered=double_buffered)
 
     def display_settings(self):
         self.thickness = 0
         self.pixel_height = 300
-        self.font_face = ImageFont.truetype('fonts/Mohave-Bold.ttf', self.pixel_height)
+        self.font_face = get_font('fonts/Mohave-Bold.ttf', self.pixel_height)
 
         self.bg_color = (0, 0, 0)
         self.text_color = (0, 215, 255)
-        self.pixels = 2000
         self.next_img = None
-        self.text_elems = None
+        self.effect = Dissolve()
         self.msg_offset = 0
-        self.ts = TextureStage.get_default()
 
-    def create_image(self, msg):
-        img = np.zeros(self.size.arr, dtype=np.uint8)
-        img_pl = Image.fromarray(img)
-        draw = ImageDraw.Draw(img_pl)
+        self.atlas = get_atlas(PILGlyphAtlas, self.font_face, self.thickness)
+        self.color_table = make_color_table(self.bg_color, self.text_color)
 
+    def layout_msg(self, msg):
         msg = msg + ' '
-        width = int(draw.textlength(msg, self.font_face))
-        msg_cnt = self.size.x // width
-        spaces = self.size.x - msg_cnt * width
-        x = 0
+        width = int(self.font_face.getlength(msg))
+        return msg, self.get_msg_positions(width), 80
 
-        for i in range(msg_cnt):
-            draw.text(
-                (x, 80),
-                msg,
-                fill=self.text_color,
-                font=self.font_face,
-                stroke_width=self.thickness
-            )
-            x += width + (spaces + i) // msg_cnt
-
-        img_pl = ImageOps.flip(img_pl)
-        img = np.array(img_pl)
-        return img
-
-    def replace_color(self, cnt, color):
-        if cnt > len(self.text_elems):
-            self.text_elems = None
-            return 0
-
-        for r, c in self.text_elems[cnt:cnt + self.pixels]:
-            idx = r * self.size.row_length + c * 3
-
-            for i in range(self.size.z):
-                self.mem_view[idx + i] = color[i]
-
-        self.update_image()
-        return self.pixels
-
-    def delete_msg(self, cnt):
-        return self.replace_color(cnt, self.bg_color)
+    def create_image(self, msg):
+        mask = np.zeros(self.size.arr[:2], dtype=np.uint8)
+        self.atlas.draw_tiled_text(mask, *self.layout_msg(msg))
 
-    def display_msg(self, cnt):
-        return self.replace_color(cnt, self.text_color)
+        mask = np.flipud(mask)
+        return self.colorize(mask)
 
     def move_letters(self, dt):
         self.msg_offset += dt * 0.1
         if self.msg_offset > 1:
             self.msg_offset = 0
 
-        uv = (self.msg_offset, 0)
-        self.model.set_tex_offset(self.ts, uv)
+        uv = (self.msg_offset, self.v_offset)
+        self.set_tex_offset(uv)
 
-    def find_text_elements(self, img):
-        idxes = np.where(~np.all(img == self.bg_color, axis=2))
-        text_elems = list(zip(idxes[0], idxes[1]))
-        np.random.shuffle(text_elems)
-        return text_elems
+        self.advance_marquee()
 
-    def prepare_for_deletion(self):
-        img = np.asarray(self.mem_view).reshape(self.size.arr)
-        self.text_elems = self.find_text_elements(img)
-
-    def prepare_for_display(self, msg):
-        img = self.create_image(msg)
-        self.text_elems = self.find_text_elements(img)
-        self.next_img = np.ravel(img)
\ No newline at end of file
+    def render_settings(self):
+        return (
+            self.font_face.path,
+            self.font_face.size,
+            self.thickness,
+            self.bg_color,
+            self.text_color
+        )
\ No newline at end of file
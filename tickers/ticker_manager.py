@@ -0,0 +1,137 @@
+import time
+from collections import deque
+from typing import NamedTuple
+
+from .base_ticker import Process
+from .texture_atlas import texture_pool
+
+
+class FrameStats(NamedTuple):
+
+    active: int     # tickers changing messages.
+    served: int     # tickers that advanced their message change.
+    deferred: int   # tickers whose work was deferred to the next frames.
+    hidden: int     # tickers out of the view.
+    uploads: int    # textures uploaded.
+    work_ms: float
+    upload_ms: float
+
+
+class TickerManager:
+    """Update all tickers under a global CPU time budget per frame.
+       Message changes of tickers with higher priorities are advanced first,
+       and the rest are deferred when the budget runs out; deferred tickers
+       gain priority each frame so that they are never starved.
+       The changed textures are uploaded in one pass at the end of the frame.
+       If a camera is given, message changes of the tickers out of its view are
+       deferred until they come into the view, and the textures of small
+       tickers on the screen are downsampled.
+        Args:
+            budget (float): seconds of CPU time for message changes in a frame.
+            camera (NodePath): the camera that shows the tickers.
+            lod_sizes (tuple): screen height fractions under which the textures
+                               are downsampled by 2, 4, ...
+    """
+
+    def __init__(self, budget=0.008, camera=None, lod_sizes=(0.25, 0.1), window=300):
+        self.budget = budget
+        self.camera = camera
+        self.lod_sizes = lod_sizes
+        self.tickers = {}
+        self.priorities = {}
+        self.waits = {}
+        self.frames = deque(maxlen=window)
+
+    def add(self, key, ticker, priority=0):
+        self.tickers[key] = ticker
+        self.priorities[key] = priority
+        self.waits[key] = 0
+
+    def remove(self, key):
+        del self.priorities[key]
+        del self.waits[key]
+        return self.tickers.pop(key)
+
+    def set_priority(self, key, priority):
+        self.priorities[key] = priority
+
+    def __getitem__(self, key):
+        return self.tickers[key]
+
+    def __iter__(self):
+        return iter(self.tickers)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def keys(self):
+        return self.tickers.keys()
+
+    def values(self):
+        return self.tickers.values()
+
+    def items(self):
+        return self.tickers.items()
+
+    def update(self, dt):
+        for ticker in self.tickers.values():
+            ticker.poll_messages()
+            ticker.animate(dt)
+
+        hidden = set()
+
+        if self.camera:
+            hidden = {key for key, ticker in self.tickers.items()
+                      if not ticker.update_view(self.camera, self.lod_sizes)}
+
+        active = [key for key, ticker in self.tickers.items() if ticker.process]
+        active.sort(key=lambda key: self.priorities[key] + self.waits[key], reverse=True)
+
+        served = deferred = 0
+        start = time.perf_counter()
+
+        for key in active:
+            ticker = self.tickers[key]
+
+            # waiting for rendering costs nothing, but passing the rendered
+            # images to the displays is charged to the budget like the steps.
+            if ticker.process == Process.PREPARE and not ticker.is_rendered():
+                continue
+
+            # nobody sees it; the work is caught up when it comes into the view.
+            if key in hidden and ticker.process != Process.PREPARE:
+                ticker.defer(dt)
+                continue
+
+            if (left := self.budget - (time.perf_counter() - start)) > 0:
+                ticker.transit(dt, left)
+                self.waits[key] = 0
+                served += 1
+            else:
+                ticker.defer(dt)
+                self.waits[key] += 1
+                deferred += 1
+
+        work_time = time.perf_counter() - start
+        uploads = sum(ticker.upload() for ticker in self.tickers.values())
+        # the pages shared by the displays are uploaded once for all of them.
+        uploads += texture_pool.flush()
+        upload_time = time.perf_counter() - start - work_time
+
+        self.frames.append(
+            FrameStats(len(active), served, deferred, len(hidden),
+                       uploads, work_time * 1000, upload_time * 1000))
+
+    def get_stats(self):
+        """Return the last frame stats and the totals of the recent frames.
+        """
+        frames = list(self.frames)
+
+        return dict(
+            last=frames[-1]._asdict() if frames else None,
+            frames=len(frames),
+            deferred=sum(f.deferred for f in frames),
+            frames_with_deferred=sum(1 for f in frames if f.deferred),
+            max_work_ms=max((f.work_ms for f in frames), default=0.0),
+            max_upload_ms=max((f.upload_ms for f in frames), default=0.0)
+        )
@@ -0,0 +1,372 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .message_cache import LRUCache
+from .row_rle import RowRLEImage
+
+
+class Schedule(NamedTuple):
+    """The order in which the units of a display are changed by an effect;
+       step k changes order[offsets[k]:offsets[k + 1]].
+    """
+
+    kind: str               # 'rows', 'cols', 'pixels' (flat indices) or 'blend' (alpha, start, stop).
+    order: np.ndarray
+    offsets: np.ndarray
+
+    @property
+    def steps(self):
+        return len(self.offsets) - 1
+
+    def get(self, step):
+        return self.order[self.offsets[step]:self.offsets[step + 1]]
+
+    def reverse(self):
+        """Return the schedule that runs the steps backwards.
+        """
+        if self.kind == 'blend':
+            return self
+
+        chunks = [self.get(k) for k in range(self.steps - 1, -1, -1)]
+        order = np.concatenate(chunks) if chunks else self.order
+        offsets = np.concatenate([[0], np.cumsum(np.diff(self.offsets)[::-1])])
+
+        return make_schedule(self.kind, order, offsets)
+
+
+def make_schedule(kind, order, offsets):
+    order = np.asarray(order, dtype=np.int32)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    # shared by displays through the cache.
+    order.flags.writeable = False
+    offsets.flags.writeable = False
+
+    return Schedule(kind, order, offsets)
+
+
+def chunk(kind, order, size):
+    """Return the schedule that changes size units of order in each step.
+    """
+    offsets = np.append(np.arange(0, len(order), size), len(order))
+    return make_schedule(kind, order, offsets)
+
+
+# Effects are immutable and hashable, so that their schedules can be cached.
+# Each make_schedule returns the schedule that deletes a message on the rows
+# btm to top; the message is displayed by the reversed one.
+
+class RowWipe(NamedTuple):
+    """Change the two edge rows of the message in each step, moving inward.
+    """
+
+    def make_schedule(self, size, top, btm):
+        rows, offsets = [], [0]
+
+        for k in range((top - btm) // 2 + 1):
+            rows.extend(sorted({top - k, btm + k}))
+            offsets.append(len(rows))
+
+        return make_schedule('rows', rows, offsets)
+
+
+class RowSweep(NamedTuple):
+    """Change the rows of the message one by one from btm to top.
+    """
+
+    def make_schedule(self, size, top, btm):
+        return chunk('rows', np.arange(btm, top + 1), 1)
+
+
+class ColumnSlide(NamedTuple):
+    """Slide the edge between the old and new messages across the columns.
+    """
+
+    cols: int = 32   # columns changed in a step.
+
+    def make_schedule(self, size, top, btm):
+        order = np.arange(size.x) if top >= btm else np.arange(0)
+        return chunk('cols', order, self.cols)
+
+
+class Dissolve(NamedTuple):
+    """Change the pixels of the message rows in a random order.
+    """
+
+    pixels: int = 2000   # pixels changed in a step.
+    seed: int = 0
+
+    def make_schedule(self, size, top, btm):
+        order = np.arange(btm * size.x, (top + 1) * size.x)
+        np.random.default_rng(self.seed).shuffle(order)
+
+        # the pixels of each step are sorted, so that they are written and
+        # looked up in encoded images in the memory order.
+        n = len(order) // self.pixels * self.pixels
+        order[:n].reshape(-1, self.pixels).sort(axis=1)
+        order[n:].sort()
+
+        return chunk('pixels', order, self.pixels)
+
+
+class Crossfade(NamedTuple):
+    """Blend the old message into the new one. A step blends a chunk of rows
+       by an alpha, so that the work of an alpha is spread over the frames.
+    """
+
+    steps: int = 16     # alphas.
+    rows: int = 8       # rows blended in a step.
+
+    def make_schedule(self, size, top, btm):
+        if top < btm:
+            return make_schedule('blend', [], [0])
+
+        # alphas are in 1/128; the last one replaces the image with the target exactly.
+        alphas = np.linspace(128 / self.steps, 128, self.steps).round()
+        starts = np.arange(btm, top + 1, self.rows)
+        stops = np.minimum(starts + self.rows, top + 1)
+
+        # all the chunks are blended by an alpha before the next alpha.
+        order = np.column_stack([
+            np.repeat(alphas, len(starts)),
+            np.tile(starts, self.steps),
+            np.tile(stops, self.steps)
+        ])
+        return chunk('blend', order.ravel(), 3)
+
+
+EFFECTS = {
+    'wipe': RowWipe(),
+    'sweep': RowSweep(),
+    'slide': ColumnSlide(),
+    'dissolve': Dissolve(),
+    'crossfade': Crossfade(),
+}
+
+
+class ScheduleCache(LRUCache):
+    """LRU cache of the schedules of the effects by the display size and the message
+       rows, bounded by the total bytes of their arrays; those of Dissolve take
+       several MB for a large display.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 ** 2):
+        super().__init__(max_bytes)
+
+    def calc_nbytes(self, schedule):
+        return schedule.order.nbytes + schedule.offsets.nbytes
+
+
+schedules = ScheduleCache()
+
+
+def schedule_key(effect, size, top, btm, reverse):
+    return (type(effect), effect, size, int(top), int(btm), reverse)
+
+
+def put_schedule(effect, size, top, btm, schedule, reverse=False):
+    """Add a schedule made in advance, like the ones loaded from prerender_cache.
+    """
+    schedules.put(schedule_key(effect, size, top, btm, reverse), schedule)
+
+
+def get_schedule(effect, size, top, btm, reverse=False):
+    """Return the schedule of the effect, cached for the display size and the message rows.
+    """
+    key = schedule_key(effect, size, top, btm, reverse)
+
+    if (schedule := schedules.get(key)) is None:
+        if reverse:
+            schedule = get_schedule(effect, size, top, btm).reverse()
+        else:
+            schedule = effect.make_schedule(size, int(top), int(btm))
+
+        schedules.put(key, schedule)
+
+    return schedule
+
+
+def find_changed_rows(img, target, rows, offset=0, span=32):
+    """Return the boolean mask of the rows of img that differ from target in the rows slice.
+       The rows are compared span rows at a time, so that an encoded image is
+       not decoded as a whole.
+        Args:
+            img (numpy.ndarray or RowRLEImage): an image.
+            target (numpy.ndarray or RowRLEImage): an image, or a pixel.
+            offset (int): the row of target compared with the first row of img.
+    """
+    changed = np.zeros(img.shape[0], dtype=bool)
+    start, stop, _ = rows.indices(img.shape[0])
+    pixel = None if np.ndim(target) == 3 else np.asarray(target, dtype=np.uint8)
+
+    for a in range(start, stop, span):
+        b = min(a + span, stop)
+        dst = target[a + offset:b + offset] if pixel is None else pixel
+        changed[a:b] = (img[a:b] != dst).reshape(b - a, -1).any(axis=1)
+
+    return changed
+
+
+class Transition:
+    """Change the message rows btm to top of img into target by the steps of a schedule.
+       Only the rows that differ from target are changed; the steps keep their
+       timing, but the units on the other rows are skipped.
+        Args:
+            img (numpy.ndarray): the (y, x, z) image of the display, changed in place.
+            target (numpy.ndarray or RowRLEImage): the (y, x, z) image to change into,
+                                                  or a pixel.
+            changed (numpy.ndarray): boolean mask of the rows to change, if not the
+                                     ones of img that differ from target.
+    """
+
+    def __init__(self, schedule, img, target, top, btm, changed=None):
+        self.schedule = schedule
+        self.img = img
+        # an encoded image is decoded by the rows or the pixels of each step.
+        self.encoded = isinstance(target, RowRLEImage)
+        self.target = target if self.encoded else np.asarray(target, dtype=np.uint8)
+        self.rows = slice(max(btm, 0), top + 1)
+
+        if changed is None:
+            changed = find_changed_rows(img, self.target, self.rows)
+
+        self.changed = changed
+        self.changed_rows = np.flatnonzero(changed)
+        # the rows that the steps so far have written.
+        self.reached = np.zeros(img.shape[0], dtype=bool)
+        # the pixels of each chunk of rows to blend, by the first row.
+        self.blends = {}
+
+    def keep_rows(self, same):
+        """Leave the rows of the boolean mask same as they are in the remaining steps.
+           The rows already reached have been changed in part, so they are
+           changed to the end whether they are in same or not; returns the rows kept.
+        """
+        same = same & ~self.reached
+        self.changed = self.changed & ~same
+        self.changed_rows = np.flatnonzero(self.changed)
+
+        w = self.img.shape[1]
+
+        for start, (src, diff, idx) in self.blends.items():
+            # the indices are sorted; only the chunks that have the rows are filtered.
+            if len(idx) and same[idx[0] // w:idx[-1] // w + 1].any():
+                keep = self.changed[idx // w]
+                self.blends[start] = (src[keep], diff[keep], idx[keep])
+
+        return same
+
+    @property
+    def steps(self):
+        return self.schedule.steps
+
+    def pick(self, idx):
+        return self.target if self.target.ndim == 1 else self.target[idx]
+
+    def pick_pixels(self, idx):
+        """idx: flat pixel indices.
+        """
+        if self.target.ndim == 1:
+            return self.target
+
+        if self.encoded:
+            return self.target.get_pixels(idx)
+
+        return self.target.reshape(-1, self.img.shape[2])[idx]
+
+    def get_blend(self, start, stop):
+        """Return the values, the differences to the target and the flat indices of
+           the pixels to blend on the rows start to stop - 1. They are found when
+           the first alpha blends the rows, so that the setup is spread over the steps.
+        """
+        if (blend := self.blends.get(start)) is None:
+            _, w, z = self.img.shape
+            rows = slice(start, stop)
+            region = dst = self.img[rows].reshape(-1, z)
+            idx = np.arange(0)
+
+            # only the pixels that differ on the rows to change are blended.
+            if self.changed[rows].any():
+                dst = np.broadcast_to(self.pick(rows), self.img[rows].shape).reshape(-1, z)
+                idx = np.flatnonzero(np.any(region != dst, axis=1))
+                idx = idx[self.changed[idx // w + start]]
+
+            # int16 holds diff * alpha, which is at most 255 * 128.
+            src = region[idx].astype(np.int16)
+            blend = self.blends[start] = (src, dst[idx].astype(np.int16) - src, idx + start * w)
+
+        return blend
+
+    def get_units(self, step):
+        """Return the units of the step on the rows to change.
+        """
+        units = self.schedule.get(step)
+
+        match self.schedule.kind:
+
+            case 'rows':
+                return units[self.changed[units]]
+
+            case 'pixels':
+                return units[self.changed[units // self.img.shape[1]]]
+
+        return units
+
+    def apply(self, step):
+        """Do the step; returns the changed rows, or None if the transition has finished.
+        """
+        if step >= self.steps:
+            return None
+
+        units = self.get_units(step)
+
+        match self.schedule.kind:
+
+            case 'rows':
+                self.img[units] = self.pick(units)
+                self.reached[units] = True
+                return units
+
+            case 'cols':
+                idx = np.ix_(self.changed_rows, units)
+                self.img[idx] = self.pick(idx)
+                self.reached[self.changed_rows] = True
+                return self.changed_rows
+
+            case 'pixels':
+                z = self.img.shape[2]
+                flat = self.img.reshape(-1, z)
+                flat[units] = self.pick_pixels(units)
+
+                rows = np.zeros(self.img.shape[0], dtype=bool)
+                rows[units // self.img.shape[1]] = True
+                self.reached |= rows
+                return np.flatnonzero(rows)
+
+            case 'blend':
+                alpha, start, stop = (int(u) for u in units)
+                src, diff, idx = self.get_blend(start, stop)
+                flat = self.img.reshape(-1, self.img.shape[2])
+                flat[idx] = src + (diff * alpha >> 7)
+                self.reached[start:stop] = True
+                return slice(start, stop)
+
+    def get_written(self, step):
+        """Return the values that the step has written, in the order of its units.
+        """
+        units = self.get_units(step)
+
+        match self.schedule.kind:
+
+            case 'rows':
+                return self.img[units]
+
+            case 'cols':
+                return self.img[np.ix_(self.changed_rows, units)]
+
+            case 'pixels':
+                return self.img.reshape(-1, self.img.shape[2])[units]
+
+            case 'blend':
+                _, start, stop = (int(u) for u in units)
+                return self.img.reshape(-1, self.img.shape[2])[self.get_blend(start, stop)[2]]
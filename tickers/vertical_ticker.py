@@ -1,23 +1,27 @@
 from panda3d.core import NodePath
 from panda3d.core import Point3, Vec3, CardMaker
 
-from .base_ticker import Process, Size, BaseTicker
+from .assets import get_texture
+from .base_ticker import Size, BaseTicker
 from .ticker_displays import VerticalDisplay
 from .models import BoxModel
 
 
 class VerticalTicker(BaseTicker):
 
-    def __init__(self, msg):
-        super().__init__('vertical_ticker')
-        self.create_ticker(msg)
+    # the texture size of the displays, which prerender.py also uses.
+    display_size = Size(256 * 10, 256 * 2, 3)
 
-    def create_ticker(self, msg):
+    def __init__(self, msg, compact=False, shared=False, double_buffered=False):
+        super().__init__('vertical_ticker', duration=1.5)
+        self.create_ticker(msg, compact, shared, double_buffered)
+
+    def create_ticker(self, msg, compact=False, shared=False, double_buffered=False):
         self.building = NodePath('buildong')
         self.building.reparent_to(self.root)
 
         model = BoxModel('building', width=5, depth=5, height=10)
-        model.set_texture(base.loader.load_texture('textures/tile_05.jpg'))
+        model.set_texture(get_texture('textures/tile_05.jpg'))
         model.reparent_to(self.building)
 
         billboard = NodePath('billboard')
@@ -27,10 +31,10 @@ class VerticalTicker(BaseTicker):
         card.set_frame(-2, 2, -2, 2)
         board = billboard.attach_new_node(card.generate())
         board.set_pos_hpr(Point3(-2.55, 0, 0), Vec3(270, 0, 0))
-        board.set_texture(base.loader.load_texture('textures/sleeping_panda.png'))
+        board.set_texture(get_texture('textures/sleeping_panda.png'))
 
         frame = BoxModel('frame', width=1, depth=1.2, height=5)
-        frame.set_texture(base.loader.load_texture('textures/concrete_01.jpg'))
+        frame.set_texture(get_texture('textures/concrete_01.jpg'))
         frame.set_pos(Point3(-2, -3.1, 2))
         frame.reparent_to(self.building)
 
@@ -40,46 +44,32 @@ class VerticalTicker(BaseTicker):
         ticker.set_pos_hpr(Point3(0, 0, 0), Vec3(0, 90, 0))
         ticker.reparent_to(frame)
 
-        size = Size(256 * 10, 256 * 2, 3)
-        self.ticker = VerticalDisplay(model, size, msg)
+        size = self.display_size
+        self.ticker = VerticalDisplay(
+            model, size, msg, compact=compact, shared=shared, double_buffered=double_buffered)
+        self.ticker.profiler = self.profiler
+
+    def count_steps(self):
+        return self.ticker.count_steps()
 
-    def change_message(self, msg):
-        if not self.process:
-            self.ticker.prepare_for_deletion()
-            self.process = Process.DELETE
-            self.next_msg = msg
+    def render_new_msg(self, msg):
+        return [self.ticker.render(msg)]
 
     def prepare_new_msg(self):
-        self.ticker.prepare_for_display(self.next_msg)
+        self.ticker.prepare_for_display(*self.get_rendered())
         self.next_msg = None
 
-    def delete_old_msg(self):
-        if (ret := self.ticker.delete_msg(self.counter)) == 0:
-            self.counter = ret
-            return True
-
-        self.counter += ret
+    def delete_old_msg(self, step):
+        return self.ticker.delete_msg(step)
 
-    def display_new_msg(self):
-        if (ret := self.ticker.display_msg(self.counter)) == 0:
-            self.counter = ret
-            return True
+    def display_new_msg(self, step):
+        return self.ticker.display_msg(step)
 
-        self.counter += ret
-
-    def update(self, dt):
+    def move_letters(self, dt):
         self.ticker.move_letters(dt)
 
-        match self.process:
-
-            case Process.DELETE:
-                if self.delete_old_msg():
-                    self.process = Process.PREPARE
-
-            case Process.PREPARE:
-                self.prepare_new_msg()
-                self.process = Process.DISPLAY
+    def update_image(self):
+        return int(self.ticker.update_image())
 
-            case Process.DISPLAY:
-                if self.display_new_msg():
-                    self.process = None
+    def get_displays(self):
+        return [self.ticker]
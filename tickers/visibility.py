@@ -0,0 +1,30 @@
+import math
+
+from panda3d.core import BoundingVolume, PerspectiveLens
+
+
+def get_screen_size(np, camera):
+    """Return the height of the bounds of np projected by the camera,
+       as a fraction of the screen height; 0 if np is out of the view.
+    """
+    if (bounds := np.get_bounds()).is_empty():
+        return 0
+
+    lens = camera.node().get_lens()
+    # get_bounds is in the coordinate space of the parent.
+    bounds = bounds.make_copy()
+    bounds.xform(np.get_parent().get_mat(camera))
+
+    if lens.make_bounds().contains(bounds) == BoundingVolume.IF_no_intersection:
+        return 0
+
+    if not isinstance(lens, PerspectiveLens):
+        return 1
+
+    dist = bounds.get_center().y
+    radius = bounds.get_radius()
+
+    if dist <= radius:
+        return 1
+
+    return min(radius / (dist * math.tan(math.radians(lens.get_fov().y / 2))), 1)